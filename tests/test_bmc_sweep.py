@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_bmc_sweep
+----------------------------------
+
+Tests for `ucsmsdk_samples.server.bmc_sweep` module, against local
+listening sockets.
+"""
+
+import socket
+import sys
+import time
+import unittest
+
+# bmc_sweep uses asyncio, it can not be imported before python 3.5
+if sys.version_info >= (3, 5):
+    import asyncio
+    from ucsmsdk_samples.server import bmc_sweep
+
+
+@unittest.skipIf(sys.version_info < (3, 5), "requires python 3.5 or later")
+class TestCimcSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(16)
+        self.open_port = self.listener.getsockname()[1]
+
+        closed = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        closed.bind(("127.0.0.1", 0))
+        self.closed_port = closed.getsockname()[1]
+        closed.close()
+
+    def tearDown(self):
+        self.listener.close()
+
+    def test_up(self):
+        report = bmc_sweep.cimc_sweep(["127.0.0.1"],
+                                      ports=[self.closed_port,
+                                             self.open_port],
+                                      timeout=1.0)
+        self.assertEqual(list(report["up"]), ["127.0.0.1"])
+        self.assertEqual(report["down"], [])
+        self.assertGreaterEqual(report["up"]["127.0.0.1"], 0)
+
+    def test_down(self):
+        report = bmc_sweep.cimc_sweep(["127.0.0.1"],
+                                      ports=[self.closed_port],
+                                      timeout=1.0)
+        self.assertEqual(report["up"], {})
+        self.assertEqual(report["down"], ["127.0.0.1"])
+        self.assertEqual(sum(count for bound, count in report["histogram"]),
+                         0)
+
+    def test_histogram(self):
+        hosts = ["127.0.0.1"] * 3
+        report = bmc_sweep.cimc_sweep(hosts, ports=[self.open_port],
+                                      timeout=1.0, buckets=[10000])
+        self.assertEqual(report["histogram"], [(10000, 1), (None, 0)])
+
+        histogram = bmc_sweep._histogram([0.5, 1, 3, 7, 100], [1, 5, 10])
+        self.assertEqual(histogram, [(1, 2), (5, 1), (10, 1), (None, 1)])
+
+    def test_timeout_per_host(self):
+        def _slow_probe(host, port, timeout):
+            return asyncio.sleep(timeout)
+
+        tcp_probe = bmc_sweep._tcp_probe
+        bmc_sweep._tcp_probe = _slow_probe
+        try:
+            start = time.time()
+            report = bmc_sweep.cimc_sweep(["127.0.0.1"],
+                                          ports=[1, 2, 3], timeout=0.2)
+        finally:
+            bmc_sweep._tcp_probe = tcp_probe
+        self.assertEqual(report["down"], ["127.0.0.1"])
+        self.assertLess(time.time() - start, 0.5)
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
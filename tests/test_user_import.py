@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_user_import
+----------------------------------
+
+Tests for `ucsmsdk_samples.admin.user.user_import`, against an in-memory
+handle.
+"""
+
+import unittest
+
+from ucsmsdk.mometa.aaa.AaaUser import AaaUser
+
+from ucsmsdk_samples.admin.user import user_import
+
+
+class MemoryHandle(object):
+    """
+    Keeps the committed objects in memory, with the UcsHandle methods used
+    by user_import
+    """
+
+    def __init__(self, mos=()):
+        self.mos = dict((mo.dn, mo) for mo in mos)
+        self.pending = []
+        self.commits = 0
+
+    def query_classids(self, *class_ids):
+        return dict((class_id, [mo for mo in self.mos.values()
+                                if mo.get_class_id() == class_id])
+                    for class_id in class_ids)
+
+    def add_mo(self, mo, modify_present=False):
+        self.pending.append(mo)
+
+    def set_mo(self, mo):
+        self.pending.append(mo)
+
+    def remove_mo(self, mo):
+        mo.status = "deleted"
+        self.pending.append(mo)
+
+    def commit(self):
+        for mo in self.pending:
+            if mo.status == "deleted":
+                self.mos.pop(mo.dn, None)
+            else:
+                self.mos[mo.dn] = mo
+        self.pending = []
+        self.commits += 1
+
+
+class TestUserImport(unittest.TestCase):
+
+    def setUp(self):
+        self.handle = MemoryHandle(
+            [AaaUser(parent_mo_or_dn="sys/user-ext", name="bob",
+                     descr="old")])
+
+    def test_rows(self):
+        report = user_import(self.handle,
+                             [{"name": "alice", "descr": "new"},
+                              {"name": "bob", "descr": "new"},
+                              {"name": "bob", "descr": "new"}],
+                             chunk_size=1)
+        self.assertEqual([row["outcome"] for row in report["rows"]],
+                         ["created", "modified", "unchanged"])
+        self.assertEqual(report["commits"], 2)
+
+    def test_unsupported_column(self):
+        report = user_import(self.handle,
+                             [{"name": "alice"},
+                              {"name": "bob", "descr": "new"},
+                              {"name": "carol", "nickname": "c"},
+                              {"name": "dave"}],
+                             chunk_size=1)
+        self.assertEqual([row["outcome"] for row in report["rows"]],
+                         ["created", "modified", "failed", "created"])
+        self.assertIn("nickname", report["rows"][2]["error"])
+        self.assertEqual(report["failed"], 1)
+        self.assertNotIn("sys/user-ext/user-carol", self.handle.mos)
+        self.assertIn("sys/user-ext/user-dave", self.handle.mos)
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
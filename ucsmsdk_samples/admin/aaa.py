@@ -0,0 +1,267 @@
+# Copyright 2015 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module reconciles the LDAP, RADIUS and TACACS+ providers, provider
+groups and LDAP group maps against a desired state document.
+"""
+
+import logging
+
+log = logging.getLogger('ucs')
+
+# {realm: (parent dn, provider class, [props managed by the reconcile])}
+# "order" is resolved separately, "key" is only set on create as it can
+# not be read back
+AAA_REALMS = {
+    "ldap": ("sys/ldap-ext", "AaaLdapProvider",
+             ["rootdn", "basedn", "port", "enable_ssl", "filter",
+              "attribute", "timeout", "vendor", "retries", "descr"]),
+    "radius": ("sys/radius-ext", "AaaRadiusProvider",
+               ["auth_port", "timeout", "retries", "descr"]),
+    "tacacs": ("sys/tacacs-ext", "AaaTacacsPlusProvider",
+               ["port", "timeout", "retries", "descr"]),
+}
+
+_MAX_ORDER = 16
+
+
+def _aaa_provider_orders(realm, desired, existing, removed):
+    """
+    Returns {name: order} of the providers of a realm after the reconcile,
+    "lowest-available" being resolved to a number
+
+    Raises:
+        ValueError: If two providers end up with the same order
+    """
+
+    orders = {}
+    for name, mo in existing.items():
+        if name not in desired and name not in removed:
+            orders[name] = mo.order
+    for name, props in desired.items():
+        order = props.get("order")
+        if order is None and name in existing:
+            order = existing[name].order
+        if order is not None and str(order) != "lowest-available":
+            orders[name] = str(order)
+
+    used = {}
+    for name, order in sorted(orders.items()):
+        if order in used:
+            raise ValueError("%s providers '%s' and '%s' have order %s" %
+                             (realm, used[order], name, order))
+        used[order] = name
+
+    for name in sorted(desired):
+        if name in orders:
+            continue
+        for order in range(1, _MAX_ORDER + 1):
+            if str(order) not in used:
+                break
+        else:
+            raise ValueError("no order available for %s provider '%s'" %
+                             (realm, name))
+        orders[name] = str(order)
+        used[str(order)] = name
+    return orders
+
+
+def aaa_reconcile(handle, desired, prune=False, dry_run=False):
+    """
+    Creates, modifies and optionally removes AAA providers, provider groups
+    and LDAP group maps so that they match the desired state. The current
+    state is loaded in a single query and the changes are pushed in a
+    single commit. Provider and provider group orders are resolved locally
+    before the commit.
+
+    Args:
+        handle (UcsHandle)
+        desired (dict): {realm: {"providers": {name: {prop: value}},
+                                 "groups": {name: {"descr": string,
+                                                   "providers": [name]}},
+                                 "group_maps": {name: {"descr": string}}}}
+            realm : "ldap", "radius" or "tacacs"
+            providers props : refer AAA_REALMS, plus "order" (1-16 or
+                              "lowest-available") and "key". key is only
+                              used when the provider is created.
+            groups providers : provider names, in order
+            group_maps : ldap only
+        prune (bool): if True, the providers, groups and group maps of the
+                      realms and sections given which are not in the
+                      desired state are removed
+        dry_run (bool): if True, only computes the diff
+
+    Returns:
+        dict: {"created": [dn], "modified": {dn: {prop: (current, desired)}},
+               "removed": [dn], "unchanged": [dn], "commits": int}
+
+    Raises:
+        ValueError: If the desired state is invalid, or provider orders
+                    conflict
+
+    Example:
+        report = aaa_reconcile(handle, {
+            "ldap": {
+                "providers": {"10.1.1.10": {"basedn": "dc=corp,dc=com",
+                                            "order": "1"},
+                              "10.1.1.11": {"basedn": "dc=corp,dc=com"}},
+                "groups": {"corp": {"providers": ["10.1.1.10",
+                                                  "10.1.1.11"]}},
+                "group_maps": {"CN=ucs-admins,DC=corp,DC=com": {}}},
+            "tacacs": {"providers": {"10.1.2.10": {"key": "secret"}}}},
+            prune=True)
+    """
+
+    from ucsmsdk.ucscoreutils import load_class
+    from ucsmsdk.mometa.aaa.AaaProviderGroup import AaaProviderGroup
+    from ucsmsdk.mometa.aaa.AaaProviderRef import AaaProviderRef
+    from ucsmsdk.mometa.aaa.AaaLdapGroup import AaaLdapGroup
+    from ucsmsdk_samples.bulk import mo_set, commit_in_chunks
+    from ucsmsdk_samples.admin.ldap_cache import ldap_group_map_invalidate
+
+    for realm, sections in desired.items():
+        if realm not in AAA_REALMS:
+            raise ValueError("Invalid AAA realm '%s'" % realm)
+        if sections.get("group_maps") and realm != "ldap":
+            raise ValueError("group maps are only supported for ldap")
+
+    provider_class_ids = [AAA_REALMS[realm][1] for realm in sorted(desired)]
+    query_data = handle.query_classids(provider_class_ids +
+                                       ["AaaProviderGroup", "AaaProviderRef",
+                                        "AaaLdapGroup"])
+
+    report = {"created": [], "modified": {}, "removed": [], "unchanged": [],
+              "commits": 0}
+    changes = []
+
+    def _remove(mo):
+        changes.append(("remove", mo))
+        report["removed"].append(mo.dn)
+
+    for realm, sections in sorted(desired.items()):
+        parent_dn, class_id, props = AAA_REALMS[realm]
+        prefix = parent_dn + "/"
+
+        providers = dict((mo.name, mo) for mo in query_data[class_id])
+        groups = dict((mo.name, mo) for mo in query_data["AaaProviderGroup"]
+                      if mo.dn.startswith(prefix))
+        refs = {}
+        for mo in query_data["AaaProviderRef"]:
+            if mo.dn.startswith(prefix):
+                group_rn = mo.dn.split("/")[2]
+                refs.setdefault(group_rn[len("providergroup-"):],
+                                {})[mo.name] = mo
+
+        desired_providers = sections.get("providers")
+        desired_groups = sections.get("groups")
+        desired_maps = sections.get("group_maps")
+
+        removed = set()
+        if desired_providers is not None:
+            if prune:
+                removed = set(providers) - set(desired_providers)
+            orders = _aaa_provider_orders(realm, desired_providers,
+                                          providers, removed)
+            for name, values in sorted(desired_providers.items()):
+                for prop in values:
+                    if prop not in props + ["order", "key"]:
+                        raise ValueError("'%s' is not a property of %s" %
+                                         (prop, class_id))
+                wanted = dict((prop, values.get(prop)) for prop in props)
+                wanted["order"] = orders[name]
+                mo = providers.get(name)
+                if mo is None:
+                    mo = load_class(class_id)(
+                        parent_mo_or_dn=parent_dn, name=name,
+                        key=values.get("key"),
+                        **dict((prop, str(value))
+                               for prop, value in wanted.items()
+                               if value is not None))
+                    changes.append(("add", mo))
+                    report["created"].append(mo.dn)
+                else:
+                    mo_set(mo, wanted, changes, report)
+            for name in sorted(removed):
+                _remove(providers[name])
+
+        final_providers = (set(providers) - removed) | \
+            set(desired_providers or {})
+
+        removed_groups = set()
+        if desired_groups is not None and prune:
+            removed_groups = set(groups) - set(desired_groups)
+            for name in sorted(removed_groups):
+                _remove(groups[name])
+
+        for name, values in sorted((desired_groups or {}).items()):
+            mo = groups.get(name)
+            if mo is None:
+                mo = AaaProviderGroup(parent_mo_or_dn=parent_dn, name=name,
+                                      descr=values.get("descr"))
+                changes.append(("add", mo))
+                report["created"].append(mo.dn)
+            else:
+                mo_set(mo, {"descr": values.get("descr")}, changes,
+                       report)
+
+            group_refs = refs.get(name, {})
+            members = values.get("providers") or []
+            if len(members) > _MAX_ORDER:
+                raise ValueError("%s provider group '%s' has more than %d "
+                                 "providers" % (realm, name, _MAX_ORDER))
+            for order, member in enumerate(members, 1):
+                if member not in final_providers:
+                    raise ValueError("%s provider '%s' of group '%s' does "
+                                     "not exist" % (realm, member, name))
+                ref = group_refs.get(member)
+                if ref is None:
+                    ref = AaaProviderRef(parent_mo_or_dn=mo.dn, name=member,
+                                         order=str(order))
+                    changes.append(("add", ref))
+                    report["created"].append(ref.dn)
+                else:
+                    mo_set(ref, {"order": order}, changes, report)
+            for member in sorted(set(group_refs) - set(members)):
+                _remove(group_refs[member])
+
+        # refs of the groups not in the desired state to removed providers
+        for name, group_refs in sorted(refs.items()):
+            if name in (desired_groups or {}) or name in removed_groups:
+                continue
+            for member in sorted(set(group_refs) & removed):
+                _remove(group_refs[member])
+
+        if desired_maps is not None:
+            maps = dict((mo.name, mo) for mo in query_data["AaaLdapGroup"])
+            for name, values in sorted(desired_maps.items()):
+                mo = maps.get(name)
+                if mo is None:
+                    mo = AaaLdapGroup(parent_mo_or_dn=parent_dn, name=name,
+                                      descr=values.get("descr"))
+                    changes.append(("add", mo))
+                    report["created"].append(mo.dn)
+                else:
+                    mo_set(mo, {"descr": values.get("descr")}, changes,
+                           report)
+            if prune:
+                for name in sorted(set(maps) - set(desired_maps)):
+                    _remove(maps[name])
+
+    log.debug("AAA reconcile: %d created, %d modified, %d removed, "
+              "%d unchanged", len(report["created"]), len(report["modified"]),
+              len(report["removed"]), len(report["unchanged"]))
+    if changes and not dry_run:
+        report["commits"] = commit_in_chunks(handle, changes, len(changes))
+        ldap_group_map_invalidate(handle)
+    return report
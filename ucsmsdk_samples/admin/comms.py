@@ -0,0 +1,216 @@
+# Copyright 2015 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module applies a communication services baseline, DNS, NTP, timezone,
+syslog and SNMP, to one or many ucs domains.
+"""
+
+import logging
+
+log = logging.getLogger('ucs')
+
+COMMS_CLASS_IDS = [
+    "CommDnsProvider",
+    "CommNtpProvider",
+    "CommDateTime",
+    "CommSyslogConsole",
+    "CommSyslogMonitor",
+    "CommSyslogFile",
+    "CommSyslogSource",
+    "CommSyslogClient",
+    "CommSnmp",
+    "CommSnmpTrap",
+    "CommSnmpUser",
+]
+
+_DNS_DN = "sys/svc-ext/dns-svc"
+_DATETIME_DN = "sys/svc-ext/datetime-svc"
+_SNMP_DN = "sys/svc-ext/snmp-svc"
+
+_SNMP_PROPS = ["admin_state", "sys_contact", "sys_location", "descr",
+               "is_set_snmp_secure"]
+_SNMP_TRAP_PROPS = ["port", "version", "notification_type", "v3_privilege"]
+_SNMP_USER_PROPS = ["descr", "auth", "use_aes"]
+# secrets can not be read back, they are only set on create
+_SNMP_SECRETS = ["community", "pwd", "privpwd"]
+
+
+def comms_baseline_apply(handle, baseline, dry_run=False):
+    """
+    Applies a communication services baseline. The current DNS, NTP,
+    timezone, syslog and SNMP configuration is loaded in a single query
+    and the difference is pushed in a single commit. Sections which are
+    not in the baseline are not modified.
+
+    Args:
+        handle (UcsHandle)
+        baseline (dict):
+            {"dns": [dns server],
+             "ntp": [ntp server],
+             "timezone": string,
+             "syslog": refer syslog_reconcile,
+             "snmp": {prop: value,
+                      "traps": {hostname: {prop: value}},
+                      "users": {name: {prop: value}}}}
+            dns and ntp servers, snmp traps and snmp users not in the
+            baseline are removed. The snmp community, trap community and
+            user passwords are only set when the object is created.
+        dry_run (bool): if True, only computes the diff
+
+    Returns:
+        dict: {"created": [dn], "modified": {dn: {prop: (current, desired)}},
+               "removed": [dn], "commits": int}
+
+    Raises:
+        ValueError: If a syslog or snmp object of the baseline is not
+                    present
+
+    Example:
+        report = comms_baseline_apply(handle, {
+            "dns": ["10.0.0.53", "10.0.1.53"],
+            "ntp": ["ntp1.corp.com", "ntp2.corp.com"],
+            "timezone": "America/Los_Angeles",
+            "syslog": {"clients": {"primary": {
+                "admin_state": "enabled", "hostname": "10.0.0.514",
+                "severity": "warnings"}}},
+            "snmp": {"admin_state": "enabled", "sys_contact": "noc",
+                     "traps": {"10.0.0.162": {"community": "trapcomm",
+                                              "port": "162",
+                                              "version": "v2c"}}}})
+    """
+
+    from ucsmsdk.mometa.comm.CommDnsProvider import CommDnsProvider
+    from ucsmsdk.mometa.comm.CommNtpProvider import CommNtpProvider
+    from ucsmsdk.mometa.comm.CommSnmpTrap import CommSnmpTrap
+    from ucsmsdk.mometa.comm.CommSnmpUser import CommSnmpUser
+    from ucsmsdk_samples.bulk import mo_set, commit_in_chunks
+    from ucsmsdk_samples.admin.syslog import syslog_changes
+
+    query_data = handle.query_classids(COMMS_CLASS_IDS)
+    existing = {}
+    for class_id in COMMS_CLASS_IDS:
+        for mo in query_data[class_id]:
+            existing[mo.dn] = mo
+
+    report = {"created": [], "modified": {}, "removed": [], "commits": 0}
+    changes = []
+
+    def _add(mo):
+        changes.append(("add", mo))
+        report["created"].append(mo.dn)
+
+    def _sync(class_id, parent_dn, names, create):
+        current = dict((mo.dn, mo) for mo in query_data[class_id]
+                       if mo.dn.startswith(parent_dn + "/"))
+        wanted = set()
+        for name in names:
+            mo = create(name)
+            wanted.add(mo.dn)
+            if mo.dn not in current:
+                _add(mo)
+        for dn in sorted(set(current) - wanted):
+            changes.append(("remove", current[dn]))
+            report["removed"].append(dn)
+
+    if baseline.get("dns") is not None:
+        _sync("CommDnsProvider", _DNS_DN, baseline["dns"],
+              lambda name: CommDnsProvider(parent_mo_or_dn=_DNS_DN,
+                                           name=name))
+
+    if baseline.get("ntp") is not None:
+        _sync("CommNtpProvider", _DATETIME_DN, baseline["ntp"],
+              lambda name: CommNtpProvider(parent_mo_or_dn=_DATETIME_DN,
+                                           name=name))
+
+    if baseline.get("timezone") is not None:
+        mo_set(_DATETIME_DN, {"timezone": baseline["timezone"]}, changes,
+               report, mos=existing)
+
+    if baseline.get("syslog") is not None:
+        for mo, diff in syslog_changes(existing, baseline["syslog"]):
+            changes.append(("set", mo))
+            report["modified"][mo.dn] = diff
+
+    snmp = baseline.get("snmp")
+    if snmp is not None:
+        mo_set(_SNMP_DN, dict((prop, snmp.get(prop)) for prop in _SNMP_PROPS),
+               changes, report, mos=existing)
+        if snmp.get("community") is not None and \
+                existing[_SNMP_DN].community in ["", None]:
+            existing[_SNMP_DN].community = snmp["community"]
+            if _SNMP_DN not in report["modified"]:
+                changes.append(("set", existing[_SNMP_DN]))
+            report["modified"].setdefault(_SNMP_DN, {})["community"] = (
+                "", "****")
+
+        for key, class_, props, name_prop in [
+                ("traps", CommSnmpTrap, _SNMP_TRAP_PROPS, "hostname"),
+                ("users", CommSnmpUser, _SNMP_USER_PROPS, "name")]:
+            desired = snmp.get(key)
+            if desired is None:
+                continue
+            current = dict((getattr(mo, name_prop), mo)
+                           for mo in query_data[class_.__name__])
+            for name, values in sorted(desired.items()):
+                wanted = dict((prop, values.get(prop)) for prop in props)
+                mo = current.get(name)
+                if mo is not None:
+                    mo_set(mo, wanted, changes, report)
+                    continue
+                kwargs = dict((prop, str(value))
+                              for prop, value in values.items()
+                              if value is not None and
+                              prop in props + _SNMP_SECRETS)
+                kwargs[name_prop] = name
+                _add(class_(parent_mo_or_dn=_SNMP_DN, **kwargs))
+            for name in sorted(set(current) - set(desired)):
+                changes.append(("remove", current[name]))
+                report["removed"].append(current[name].dn)
+
+    log.debug("Comms baseline: %d created, %d modified, %d removed",
+              len(report["created"]), len(report["modified"]),
+              len(report["removed"]))
+    if changes and not dry_run:
+        report["commits"] = commit_in_chunks(handle, changes, len(changes))
+    return report
+
+
+def comms_baseline_apply_all(handles, baseline, max_workers=8,
+                             dry_run=False):
+    """
+    Applies a communication services baseline to many ucs domains in
+    parallel, refer comms_baseline_apply
+
+    Args:
+        handles (list of UcsHandle): logged in handles
+        baseline (dict): refer comms_baseline_apply
+        max_workers (int): maximum domains processed at the same time
+        dry_run (bool): if True, only computes the diff
+
+    Returns:
+        dict: {handle.ip: {"result": report of comms_baseline_apply,
+                           "error": string, None on success,
+                           "latency": seconds}}
+
+    Example:
+        report = comms_baseline_apply_all(handles, baseline, max_workers=4)
+        failed = [ip for ip, entry in report.items() if entry["error"]]
+    """
+
+    from ucsmsdk_samples.bulk import run_on_handles
+
+    return run_on_handles(
+        handles,
+        lambda handle: comms_baseline_apply(handle, baseline, dry_run),
+        max_workers)
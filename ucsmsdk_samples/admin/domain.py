@@ -329,3 +329,180 @@ def native_authentication_console(handle, realm=None, provider_group=None,
     handle.set_mo(mo)
     handle.commit()
     return mo
+
+
+_AUTH_REALM_DN = "sys/auth-realm"
+_AUTH_NATIVE_PROPS = ["def_role_policy", "def_login", "con_login", "descr"]
+_AUTH_DEFAULT_PROPS = ["realm", "provider_group", "session_timeout",
+                       "refresh_period", "use2_factor"]
+_AUTH_CONSOLE_PROPS = ["realm", "provider_group", "use2_factor"]
+_AUTH_DOMAIN_PROPS = ["refresh_period", "session_timeout", "descr"]
+_AUTH_DOMAIN_REALM_PROPS = ["realm", "provider_group", "use2_factor"]
+
+
+def _auth_props(section, props, allowed):
+    for prop in props:
+        if prop not in allowed:
+            raise ValueError("'%s' is not a property of %s" %
+                             (prop, section))
+    return dict((prop, props.get(prop)) for prop in allowed)
+
+
+def auth_model_apply(handle, model, prune=False, dry_run=False):
+    """
+    Applies an authentication model: the native authentication, the
+    default and console authentication and every authentication domain
+    with its realm. The current state is read with a single query and the
+    changes are pushed in a single commit.
+
+    Args:
+        handle (UcsHandle)
+        model (dict):
+            {"native": {prop: value},
+             "default": {prop: value},
+             "console": {prop: value},
+             "domains": {name: {prop: value}}}
+            native props : def_role_policy, def_login, con_login, descr
+            default props : realm, provider_group, session_timeout,
+                            refresh_period, use2_factor
+            console props : realm, provider_group, use2_factor
+            domains props : refresh_period, session_timeout, descr, realm,
+                            provider_group, use2_factor
+            Sections which are not in the model are not modified.
+        prune (bool): if True, the domains which are not in the model are
+                      removed
+        dry_run (bool): if True, only computes the diff
+
+    Returns:
+        dict: {"created": [dn], "modified": {dn: {prop: (current, desired)}},
+               "removed": [dn], "commits": int}
+
+    Raises:
+        ValueError: If the model uses an invalid property or a provider
+                    group which does not exist in its realm
+
+    Example:
+        auth_model_apply(handle, {
+            "default": {"realm": "ldap", "provider_group": "corp"},
+            "console": {"realm": "local"},
+            "domains": {"tacacs": {"realm": "tacacs",
+                                   "provider_group": "noc"}}})
+    """
+
+    from ucsmsdk.mometa.aaa.AaaDomain import AaaDomain
+    from ucsmsdk.mometa.aaa.AaaDomainAuth import AaaDomainAuth
+    from ucsmsdk_samples.bulk import mo_set, commit_in_chunks
+    from ucsmsdk_samples.admin.aaa import AAA_REALMS
+
+    query_data = handle.query_classids(
+        "AaaAuthRealm", "AaaDefaultAuth", "AaaConsoleAuth", "AaaDomain",
+        "AaaDomainAuth", "AaaProviderGroup")
+    existing = {}
+    for class_id in ["AaaAuthRealm", "AaaDefaultAuth", "AaaConsoleAuth",
+                     "AaaDomain", "AaaDomainAuth"]:
+        for mo in query_data[class_id]:
+            existing[mo.dn] = mo
+    provider_groups = set(mo.dn for mo in query_data["AaaProviderGroup"])
+
+    def _check_provider_group(section, props):
+        realm = props.get("realm")
+        if realm is None or not props.get("provider_group"):
+            return
+        if realm not in AAA_REALMS:
+            raise ValueError("realm '%s' of %s has no provider groups" %
+                             (realm, section))
+        dn = "%s/providergroup-%s" % (AAA_REALMS[realm][0],
+                                      props["provider_group"])
+        if dn not in provider_groups:
+            raise ValueError("provider group '%s' of %s does not exist" %
+                             (dn, section))
+
+    report = {"created": [], "modified": {}, "removed": [], "commits": 0}
+    changes = []
+
+    for section, rn, allowed in [
+            ("native", "", _AUTH_NATIVE_PROPS),
+            ("default", "/default-auth", _AUTH_DEFAULT_PROPS),
+            ("console", "/console-auth", _AUTH_CONSOLE_PROPS)]:
+        if model.get(section) is not None:
+            props = _auth_props(section, model[section], allowed)
+            _check_provider_group(section, props)
+            mo_set(_AUTH_REALM_DN + rn, props, changes, report,
+                   mos=existing)
+
+    domains = model.get("domains")
+    for name, values in sorted((domains or {}).items()):
+        section = "domain '%s'" % name
+        _auth_props(section, values,
+                    _AUTH_DOMAIN_PROPS + _AUTH_DOMAIN_REALM_PROPS)
+        props = dict((prop, values.get(prop))
+                     for prop in _AUTH_DOMAIN_PROPS)
+        realm_props = dict((prop, values.get(prop))
+                           for prop in _AUTH_DOMAIN_REALM_PROPS)
+        _check_provider_group(section, realm_props)
+
+        dn = _AUTH_REALM_DN + "/domain-" + name
+        if dn not in existing:
+            mo = AaaDomain(parent_mo_or_dn=_AUTH_REALM_DN, name=name,
+                           **dict((prop, str(value))
+                                  for prop, value in props.items()
+                                  if value is not None))
+            AaaDomainAuth(parent_mo_or_dn=mo,
+                          **dict((prop, str(value))
+                                 for prop, value in realm_props.items()
+                                 if value is not None))
+            changes.append(("add", mo))
+            report["created"].append(dn)
+            continue
+
+        mo_set(dn, props, changes, report, mos=existing)
+        if dn + "/domain-auth" in existing:
+            mo_set(dn + "/domain-auth", realm_props, changes, report,
+                   mos=existing)
+        elif any(value is not None for value in realm_props.values()):
+            mo = AaaDomainAuth(parent_mo_or_dn=dn,
+                               **dict((prop, str(value))
+                                      for prop, value in realm_props.items()
+                                      if value is not None))
+            changes.append(("add", mo))
+            report["created"].append(mo.dn)
+
+    if domains is not None and prune:
+        for mo in query_data["AaaDomain"]:
+            if mo.name not in domains:
+                changes.append(("remove", mo))
+                report["removed"].append(mo.dn)
+
+    if changes and not dry_run:
+        report["commits"] = commit_in_chunks(handle, changes, len(changes))
+    return report
+
+
+def auth_model_apply_all(handles, model, max_workers=8, prune=False,
+                         dry_run=False):
+    """
+    Applies an authentication model to many ucs domains in parallel,
+    refer auth_model_apply
+
+    Args:
+        handles (list of UcsHandle): logged in handles
+        model (dict): refer auth_model_apply
+        max_workers (int): maximum domains processed at the same time
+        prune (bool): refer auth_model_apply
+        dry_run (bool): if True, only computes the diff
+
+    Returns:
+        dict: {handle.ip: {"result": report of auth_model_apply,
+                           "error": string, None on success,
+                           "latency": seconds}}
+
+    Example:
+        report = auth_model_apply_all(handles, model, max_workers=10)
+    """
+
+    from ucsmsdk_samples.bulk import run_on_handles
+
+    return run_on_handles(
+        handles,
+        lambda handle: auth_model_apply(handle, model, prune, dry_run),
+        max_workers)
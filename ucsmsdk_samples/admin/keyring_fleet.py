@@ -0,0 +1,279 @@
+# Copyright 2015 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module tracks the keyrings, certificate requests and trusted points of
+many ucs domains, with an index of the certificate expiry dates.
+"""
+
+import calendar
+import logging
+import re
+import subprocess
+import time
+
+log = logging.getLogger('ucs')
+
+_PEM_CERT_RE = re.compile(
+    r"-----BEGIN CERTIFICATE-----.+?-----END CERTIFICATE-----", re.S)
+
+_PKI_DN = "sys/pki-ext"
+
+# openssl prints english month names, whatever the locale
+_MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep",
+           "Oct", "Nov", "Dec"]
+
+
+def cert_expiry(pem):
+    """
+    Returns the earliest expiry date of the certificates of a PEM string,
+    using the system openssl command
+
+    Args:
+        pem (string): certificate or certificate chain
+
+    Returns:
+        float: seconds since the epoch, None if the PEM string has no
+               certificate or openssl is not available
+
+    Example:
+        expires = cert_expiry(keyring.cert)
+    """
+
+    expiry = None
+    for cert in _PEM_CERT_RE.findall(pem or ""):
+        try:
+            process = subprocess.Popen(
+                ["openssl", "x509", "-noout", "-enddate"],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE)
+            out, err = process.communicate(cert.encode())
+        except OSError as e:
+            log.debug("openssl is not available: %s", e)
+            return None
+        if process.returncode != 0:
+            continue
+        # notAfter=Jan  1 00:00:00 2030 GMT
+        not_after = out.decode().strip().split("=", 1)[-1]
+        month, day, clock, year = not_after.split()[:4]
+        hour, minute, second = clock.split(":")
+        expires = calendar.timegm(
+            (int(year), _MONTHS.index(month) + 1, int(day), int(hour),
+             int(minute), int(second), 0, 0, 0))
+        if expiry is None or expires < expiry:
+            expiry = expires
+    return expiry
+
+
+def keyring_inventory(handle):
+    """
+    Returns the keyrings, certificate requests and trusted points of a
+    domain, using a single query
+
+    Args:
+        handle (UcsHandle)
+
+    Returns:
+        dict: {"keyrings": {name: {"dn": string, "tp": string,
+                                   "modulus": string,
+                                   "cert_status": string,
+                                   "expires": seconds since the epoch,
+                                   "csr": subject of the certificate
+                                          request, None if none}},
+               "trustpoints": {name: {"dn": string, "cert_status": string,
+                                      "expires": seconds since the epoch}}}
+
+    Example:
+        inventory = keyring_inventory(handle)
+    """
+
+    query_data = handle.query_classids("PkiKeyRing", "PkiCertReq", "PkiTP")
+
+    csrs = dict((mo.dn.rsplit("/", 1)[0], mo)
+                for mo in query_data["PkiCertReq"])
+    inventory = {"keyrings": {}, "trustpoints": {}}
+    for mo in query_data["PkiKeyRing"]:
+        csr = csrs.get(mo.dn)
+        inventory["keyrings"][mo.name] = {
+            "dn": mo.dn,
+            "tp": mo.tp,
+            "modulus": mo.modulus,
+            "cert_status": mo.cert_status,
+            "expires": cert_expiry(mo.cert),
+            "csr": csr.subj_name if csr is not None and csr.req else None}
+    for mo in query_data["PkiTP"]:
+        inventory["trustpoints"][mo.name] = {
+            "dn": mo.dn,
+            "cert_status": mo.cert_status,
+            "expires": cert_expiry(mo.cert_chain)}
+    return inventory
+
+
+def _csr_create(handle, keyrings, regen):
+    """
+    Creates certificate requests for keyrings of one domain in a single
+    commit
+    """
+
+    from ucsmsdk.mometa.pki.PkiKeyRing import PkiKeyRing
+    from ucsmsdk.mometa.pki.PkiCertReq import PkiCertReq
+
+    existing = dict((mo.name, mo)
+                    for mo in handle.query_classid("PkiKeyRing"))
+
+    result = {"keyrings": [], "created": []}
+    for name, props in sorted(keyrings.items()):
+        props = dict(props)
+        modulus = props.pop("modulus", None)
+        keyring = existing.get(name)
+        if keyring is None:
+            keyring = PkiKeyRing(parent_mo_or_dn=_PKI_DN, name=name,
+                                 modulus=modulus or "mod2048")
+            handle.add_mo(keyring, True)
+            result["created"].append(keyring.dn)
+        elif regen or modulus:
+            if modulus:
+                keyring.modulus = modulus
+            if regen:
+                keyring.regen = "yes"
+            handle.set_mo(keyring)
+        handle.add_mo(PkiCertReq(parent_mo_or_dn=keyring.dn, **props),
+                      modify_present=True)
+        result["keyrings"].append(keyring.dn)
+
+    if result["keyrings"]:
+        handle.commit()
+    return result
+
+
+class KeyringFleet(object):
+    """
+    Keyrings, certificate requests and trusted points of many ucs domains,
+    collected in parallel.
+
+    Args:
+        handles (list of UcsHandle): logged in handles
+        max_workers (int): maximum domains processed at the same time
+
+    Example:
+        fleet = KeyringFleet(handles, max_workers=10)
+        fleet.collect()
+        for expires, ip, kind, name in fleet.expiring(days=30):
+            ...
+        fleet.csr_create(dict((ip, {"web": {"subj_name": ip,
+                                            "country": "US"}})
+                              for ip in fleet.handles), regen=True)
+    """
+
+    def __init__(self, handles, max_workers=8):
+        self.handles = dict((handle.ip, handle) for handle in handles)
+        self.max_workers = max_workers
+        self.inventory = {}
+        self.errors = {}
+
+    def collect(self, ips=None):
+        """
+        Collects the inventory of the domains, all the domains by default
+
+        Returns:
+            dict: {handle.ip: error} of the domains which failed
+        """
+
+        from ucsmsdk_samples.bulk import run_on_handles
+
+        handles = [self.handles[ip] for ip in (ips or sorted(self.handles))]
+        results = run_on_handles(handles, keyring_inventory,
+                                 self.max_workers)
+        for ip, entry in results.items():
+            if entry["error"] is None:
+                self.inventory[ip] = entry["result"]
+                self.errors.pop(ip, None)
+            else:
+                self.errors[ip] = entry["error"]
+        log.debug("Collected keyrings of %d domains, %d failed",
+                  len(results) - len(self.errors), len(self.errors))
+        return dict((ip, self.errors[ip]) for ip in results
+                    if ip in self.errors)
+
+    def expiry_index(self):
+        """
+        Returns every certificate by expiry date
+
+        Returns:
+            list: [(expires, handle.ip, "keyring" or "trustpoint", name)]
+                  sorted by expiry, certificates whose expiry is unknown
+                  are not included
+        """
+
+        index = []
+        for ip, inventory in self.inventory.items():
+            for kind, key in [("keyring", "keyrings"),
+                              ("trustpoint", "trustpoints")]:
+                for name, entry in inventory[key].items():
+                    if entry["expires"] is not None:
+                        index.append((entry["expires"], ip, kind, name))
+        return sorted(index)
+
+    def expiring(self, days=30, now=None):
+        """
+        Returns the certificates of expiry_index which expire within
+        'days' days
+        """
+
+        limit = (now or time.time()) + days * 86400
+        return [entry for entry in self.expiry_index() if entry[0] <= limit]
+
+    def pending_csrs(self):
+        """
+        Returns [(handle.ip, keyring name, subject)] of the keyrings with a
+        certificate request
+        """
+
+        return sorted((ip, name, entry["csr"])
+                      for ip, inventory in self.inventory.items()
+                      for name, entry in inventory["keyrings"].items()
+                      if entry["csr"] is not None)
+
+    def csr_create(self, csrs, regen=False):
+        """
+        Creates certificate requests on many domains in parallel, with a
+        single commit per domain. Missing keyrings are created. The
+        inventory of the domains is collected again afterwards.
+
+        Args:
+            csrs (dict): {handle.ip: {keyring name: {prop: value}}}
+                props : PkiCertReq props (subj_name, dns, country, state,
+                        locality, org_name, org_unit_name, email, pwd, ip,
+                        ipv6, ...) and the keyring "modulus"
+            regen (bool): if True, the key of existing keyrings is
+                          regenerated
+
+        Returns:
+            dict: {handle.ip: {"result": {"keyrings": [dn],
+                                          "created": [dn]},
+                               "error": string, None on success,
+                               "latency": seconds}}
+        """
+
+        from ucsmsdk_samples.bulk import run_on_handles
+
+        for ip in csrs:
+            if ip not in self.handles:
+                raise ValueError("No handle for domain '%s'" % ip)
+
+        results = run_on_handles(
+            [self.handles[ip] for ip in sorted(csrs)],
+            lambda handle: _csr_create(handle, csrs[handle.ip], regen),
+            self.max_workers)
+        self.collect(sorted(csrs))
+        return results
@@ -15,6 +15,8 @@
 This module performs the operation related to ldap.
 """
 
+from ucsmsdk_samples.admin.ldap_cache import ldap_group_map_invalidate
+
 
 def ldap_provider_create(handle, name, order="lowest-available", rootdn="",
                          basedn="", port="389", enable_ssl="no", filter="",
@@ -283,6 +285,7 @@ def ldap_group_map_create(handle, name, descr=""):
     mo = AaaLdapGroup(parent_mo_or_dn="sys/ldap-ext", name=name, descr=descr)
     handle.add_mo(mo, True)
     handle.commit()
+    ldap_group_map_invalidate(handle)
     return mo
 
 
@@ -336,6 +339,7 @@ def ldap_group_map_delete(handle, name):
 
     handle.remove_mo(mo)
     handle.commit()
+    ldap_group_map_invalidate(handle)
 
 
 def ldap_group_map_add_role(handle, ldap_group_map_name, name, descr=""):
@@ -367,6 +371,7 @@ def ldap_group_map_add_role(handle, ldap_group_map_name, name, descr=""):
     mo = AaaUserRole(parent_mo_or_dn=obj, name=name, descr=descr)
     handle.add_mo(mo, True)
     handle.commit()
+    ldap_group_map_invalidate(handle)
     return mo
 
 
@@ -428,6 +433,7 @@ def ldap_group_map_remove_role(handle, ldap_group_map_name, name):
 
     handle.remove_mo(mo)
     handle.commit()
+    ldap_group_map_invalidate(handle)
 
 
 def ldap_provider_group_create(handle, name, descr=""):
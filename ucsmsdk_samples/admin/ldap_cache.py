@@ -0,0 +1,279 @@
+# Copyright 2015 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains an in-memory view of the LDAP group maps, with the
+roles, privileges, locales and orgs granted by every LDAP group.
+"""
+
+import logging
+import weakref
+
+log = logging.getLogger('ucs')
+
+_CACHES = weakref.WeakKeyDictionary()
+
+_LDAP_EXT_DN = "sys/ldap-ext"
+
+
+class LdapGroupMapCache(object):
+    """
+    Answers "what does LDAP group X grant" from memory. The group maps,
+    their roles and locales, the roles privileges and the locales orgs are
+    loaded with a single query, on first use and after invalidate(). The
+    cache only keeps a weak reference to the handle.
+
+    Args:
+        handle (UcsHandle)
+
+    Example:
+        cache = LdapGroupMapCache(handle)
+        privs = cache.privileges("CN=ucs-admins,OU=groups,DC=corp,DC=com")
+        cache.roles_apply(add={"CN=ucs-ops,DC=corp,DC=com": ["operations"]})
+    """
+
+    def __init__(self, handle):
+        self._handle = weakref.ref(handle)
+        self._groups = None
+        self._privs = None
+        self._orgs = None
+
+    @property
+    def handle(self):
+        handle = self._handle()
+        if handle is None:
+            raise ValueError("The handle of the cache no longer exists")
+        return handle
+
+    def load(self):
+        """
+        Loads the group maps, roles and locales
+        """
+
+        query_data = self.handle.query_classids(
+            "AaaLdapGroup", "AaaUserRole", "AaaUserLocale", "AaaRole",
+            "AaaOrg")
+
+        self._groups = {}
+        group_names = {}
+        for mo in query_data["AaaLdapGroup"]:
+            self._groups[mo.name] = {"roles": {}, "locales": {}}
+            group_names[mo.dn] = mo.name
+
+        for class_id, key in [("AaaUserRole", "roles"),
+                              ("AaaUserLocale", "locales")]:
+            for mo in query_data[class_id]:
+                name = group_names.get(mo.dn.rsplit("/", 1)[0])
+                # roles and locales of local and remote users
+                if name is not None:
+                    self._groups[name][key][mo.name] = mo
+
+        self._privs = {}
+        for mo in query_data["AaaRole"]:
+            self._privs[mo.name] = set(
+                priv for priv in (mo.priv or "").split(",") if priv)
+
+        self._orgs = {}
+        for mo in query_data["AaaOrg"]:
+            locale_rn = mo.dn.split("/")[2]
+            self._orgs.setdefault(locale_rn[len("locale-"):],
+                                  set()).add(mo.org_dn)
+
+        log.debug("Loaded %d ldap group maps", len(self._groups))
+
+    def invalidate(self):
+        """
+        Drops the in-memory copy, it is reloaded on next use
+        """
+
+        self._groups = None
+
+    def _group(self, name):
+        if self._groups is None:
+            self.load()
+        if name not in self._groups:
+            raise ValueError("Ldap Group map '%s' does not exist" % name)
+        return self._groups[name]
+
+    def groups(self):
+        """
+        Returns the names of the ldap group maps
+        """
+
+        if self._groups is None:
+            self.load()
+        return sorted(self._groups)
+
+    def roles(self, name):
+        """
+        Returns the roles granted by an ldap group
+        """
+
+        return set(self._group(name)["roles"])
+
+    def locales(self, name):
+        """
+        Returns the locales granted by an ldap group
+        """
+
+        return set(self._group(name)["locales"])
+
+    def privileges(self, name):
+        """
+        Returns the privileges granted by the roles of an ldap group
+        """
+
+        privs = set()
+        for role in self._group(name)["roles"]:
+            privs.update(self._privs.get(role, ()))
+        return privs
+
+    def orgs(self, name):
+        """
+        Returns the org dns of the locales of an ldap group. An empty set
+        means the group is not restricted to orgs.
+        """
+
+        orgs = set()
+        for locale in self._group(name)["locales"]:
+            orgs.update(self._orgs.get(locale, ()))
+        return orgs
+
+    def groups_with_role(self, role):
+        """
+        Returns the names of the ldap groups which grant a role
+        """
+
+        return sorted(name for name in self.groups()
+                      if role in self._groups[name]["roles"])
+
+    def groups_with_privilege(self, priv):
+        """
+        Returns the names of the ldap groups which grant a privilege
+        """
+
+        return sorted(name for name in self.groups()
+                      if priv in self.privileges(name))
+
+    def _apply(self, key, class_, add, remove, dry_run):
+        staged = []
+        for name, children in sorted((add or {}).items()):
+            current = self._group(name)[key]
+            for child in sorted(set(children) - set(current)):
+                mo = class_(parent_mo_or_dn="%s/ldapgroup-%s" %
+                            (_LDAP_EXT_DN, name), name=child)
+                staged.append(("add", name, child, mo))
+        for name, children in sorted((remove or {}).items()):
+            current = self._group(name)[key]
+            for child in sorted(set(children) & set(current)):
+                staged.append(("remove", name, child, current[child]))
+
+        report = {"added": [], "removed": [], "commits": 0}
+        for action, name, child, mo in staged:
+            if action == "add":
+                report["added"].append((name, child))
+            else:
+                report["removed"].append((name, child))
+        if not staged or dry_run:
+            return report
+
+        for action, name, child, mo in staged:
+            if action == "add":
+                self.handle.add_mo(mo, True)
+            else:
+                self.handle.remove_mo(mo)
+        self.handle.commit()
+        report["commits"] = 1
+
+        for action, name, child, mo in staged:
+            if action == "add":
+                self._groups[name][key][child] = mo
+            else:
+                del self._groups[name][key][child]
+        return report
+
+    def roles_apply(self, add=None, remove=None, dry_run=False):
+        """
+        Adds and removes roles of many ldap groups in a single commit.
+        Roles which are already added or already removed are skipped.
+
+        Args:
+            add (dict): {group name: [role]}
+            remove (dict): {group name: [role]}
+            dry_run (bool): if True, only returns the changes
+
+        Returns:
+            dict: {"added": [(group name, role)],
+                   "removed": [(group name, role)], "commits": int}
+
+        Raises:
+            ValueError: If AaaLdapGroup is not present
+        """
+
+        from ucsmsdk.mometa.aaa.AaaUserRole import AaaUserRole
+
+        return self._apply("roles", AaaUserRole, add, remove, dry_run)
+
+    def locales_apply(self, add=None, remove=None, dry_run=False):
+        """
+        Adds and removes locales of many ldap groups in a single commit,
+        refer roles_apply
+        """
+
+        from ucsmsdk.mometa.aaa.AaaUserLocale import AaaUserLocale
+
+        return self._apply("locales", AaaUserLocale, add, remove, dry_run)
+
+
+def ldap_group_map_cache(handle):
+    """
+    Returns the ldap group map cache shared by the sample methods for the
+    handle
+
+    Args:
+        handle (UcsHandle)
+
+    Returns:
+        LdapGroupMapCache
+
+    Example:
+        privs = dict((handle.ip,
+                      ldap_group_map_cache(handle).privileges(group))
+                     for handle in handles)
+    """
+
+    cache = _CACHES.get(handle)
+    if cache is None:
+        cache = LdapGroupMapCache(handle)
+        _CACHES[handle] = cache
+    return cache
+
+
+def ldap_group_map_invalidate(handle):
+    """
+    Invalidates the ldap group map cache shared for the handle. Called by
+    the sample methods which modify ldap group maps, roles and locales.
+
+    Args:
+        handle (UcsHandle)
+
+    Returns:
+        None
+
+    Example:
+        ldap_group_map_invalidate(handle)
+    """
+
+    cache = _CACHES.get(handle)
+    if cache is not None:
+        cache.invalidate()
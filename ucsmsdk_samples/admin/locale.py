@@ -15,6 +15,8 @@
 This module performs the operation related to dns server management.
 """
 
+from ucsmsdk_samples.admin.ldap_cache import ldap_group_map_invalidate
+
 
 def locale_create(handle, name, descr="", policy_owner="local"):
     """
@@ -131,6 +133,7 @@ def locale_delete(handle, name):
 
     handle.remove_mo(mo)
     handle.commit()
+    ldap_group_map_invalidate(handle)
 
 
 def locale_assign_org(handle, locale_name, name, org_dn="org-root", descr=""):
@@ -164,6 +167,7 @@ def locale_assign_org(handle, locale_name, name, org_dn="org-root", descr=""):
     mo = AaaOrg(parent_mo_or_dn=obj, name=name, org_dn=org_dn, descr=descr)
     handle.add_mo(mo, True)
     handle.commit()
+    ldap_group_map_invalidate(handle)
     return mo
 
 
@@ -197,3 +201,105 @@ def locale_deassign_org(handle, locale_name, name):
 
     handle.remove_mo(mo)
     handle.commit()
+    ldap_group_map_invalidate(handle)
+
+
+def _locale_org_name(org_dn, used):
+    """
+    Returns a name for the org reference of a locale, unique in 'used'
+    """
+
+    name = org_dn.rsplit("/", 1)[-1]
+    name = name[len("org-"):] if name.startswith("org-") else "root"
+    name = name[:16]
+    suffix = 1
+    while name in used:
+        suffix += 1
+        tail = "-%d" % suffix
+        name = name[:16 - len(tail)] + tail
+    used.add(name)
+    return name
+
+
+def locale_org_sync(handle, desired, create_locales=False, dry_run=False):
+    """
+    Assigns orgs to many locales so that every locale references exactly
+    the given orgs. The locales, org references and orgs are loaded in a
+    single query and the changes are pushed in a single commit.
+
+    Args:
+        handle (UcsHandle)
+        desired (dict): {locale name: [org dn]}, locales which are not
+                        in the map are not modified
+        create_locales (bool): if True, the missing locales are created,
+                               otherwise they raise ValueError
+        dry_run (bool): if True, only computes the changes
+
+    Returns:
+        dict: {"created": [locale name], "added": {locale name: [org dn]},
+               "removed": {locale name: [org dn]}, "commits": int}
+
+    Raises:
+        ValueError: If AaaLocale or OrgOrg is not present
+
+    Example:
+        locale_org_sync(handle, {
+            "tenant-a": ["org-root/org-a", "org-root/org-shared"],
+            "tenant-b": ["org-root/org-b", "org-root/org-shared"]})
+    """
+
+    from ucsmsdk.mometa.aaa.AaaLocale import AaaLocale
+    from ucsmsdk.mometa.aaa.AaaOrg import AaaOrg
+
+    query_data = handle.query_classids("AaaLocale", "AaaOrg", "OrgOrg")
+    orgs = set(mo.dn for mo in query_data["OrgOrg"])
+    locales = dict((mo.name, mo) for mo in query_data["AaaLocale"])
+    refs = {}
+    for mo in query_data["AaaOrg"]:
+        locale_rn = mo.dn.split("/")[2]
+        refs.setdefault(locale_rn[len("locale-"):], []).append(mo)
+
+    for name, org_dns in sorted(desired.items()):
+        if name not in locales and not create_locales:
+            raise ValueError("Locale '%s' does not exist" % name)
+        for org_dn in org_dns:
+            if org_dn not in orgs:
+                raise ValueError("org '%s' does not exist" % org_dn)
+
+    report = {"created": [], "added": {}, "removed": {}, "commits": 0}
+    changes = []
+    for name, org_dns in sorted(desired.items()):
+        locale = locales.get(name)
+        if locale is None:
+            locale = AaaLocale(parent_mo_or_dn="sys/user-ext", name=name)
+            changes.append(("add", locale))
+            report["created"].append(name)
+
+        current = dict((mo.org_dn, mo) for mo in refs.get(name, []))
+        # names of removed references are not reused, the commit buffer
+        # holds one change per dn
+        used = set(mo.name for mo in refs.get(name, []))
+        removed = sorted(set(current) - set(org_dns))
+        added = sorted(set(org_dns) - set(current))
+        for org_dn in removed:
+            changes.append(("remove", current[org_dn]))
+        for org_dn in added:
+            changes.append(("add", AaaOrg(
+                parent_mo_or_dn=locale.dn,
+                name=_locale_org_name(org_dn, used),
+                org_dn=org_dn)))
+        if removed:
+            report["removed"][name] = removed
+        if added:
+            report["added"][name] = added
+
+    if changes and not dry_run:
+        for action, mo in changes:
+            if action == "add":
+                handle.add_mo(mo, True)
+            else:
+                handle.remove_mo(mo)
+        handle.commit()
+        report["commits"] = 1
+        ldap_group_map_invalidate(handle)
+    return report
@@ -15,6 +15,26 @@
 This module performs the operation related to role.
 """
 
+from ucsmsdk_samples.admin.ldap_cache import ldap_group_map_invalidate
+
+# roles which come with UCSM and can not be removed
+_BUILTIN_ROLES = ["aaa", "admin", "facility-manager", "network",
+                  "operations", "read-only", "server-compute",
+                  "server-equipment", "server-profile", "server-security",
+                  "storage"]
+
+
+def _priv_set(priv):
+    """
+    Returns the privileges of a comma separated string as a set
+    """
+
+    from six import string_types
+
+    if isinstance(priv, string_types):
+        priv = priv.split(",")
+    return set(p.strip() for p in priv or [] if p.strip())
+
 
 def role_create(handle, name, priv, descr="", policy_owner="local"):
     """
@@ -44,6 +64,7 @@ def role_create(handle, name, priv, descr="", policy_owner="local"):
                  policy_owner=policy_owner)
     handle.add_mo(mo, True)
     handle.commit()
+    ldap_group_map_invalidate(handle)
     return mo
 
 
@@ -68,8 +89,8 @@ def role_exists(handle, name, priv, descr="", policy_owner="local"):
     dn = "sys/user-ext/role-" + name
     mo = handle.query_dn(dn)
     if mo:
-        if ((priv and mo.priv != priv) and
-            (descr and mo.descr != descr) and
+        if ((priv and _priv_set(mo.priv) != _priv_set(priv)) or
+            (descr and mo.descr != descr) or
             (policy_owner and mo.policy_owner != policy_owner)):
             return False
         return True
@@ -111,6 +132,7 @@ def role_modify(handle, name, priv=None, descr=None, policy_owner=None):
 
     handle.set_mo(mo)
     handle.commit()
+    ldap_group_map_invalidate(handle)
     return mo
 
 
@@ -139,3 +161,231 @@ def role_delete(handle, name):
 
     handle.remove_mo(mo)
     handle.commit()
+    ldap_group_map_invalidate(handle)
+
+
+class RoleMatrix(object):
+    """
+    In-memory matrix of roles and privileges. Every role and the roles of
+    the local and remote users are loaded with a single query and the
+    privileges of a role are kept as a bitset, so privileges compare as
+    sets and set queries are answered from memory.
+
+    Args:
+        handle (UcsHandle)
+
+    Example:
+        matrix = RoleMatrix(handle)
+        users = matrix.users_with("power-mgmt")
+        privs = matrix.privs(matrix.user_mask("admin", "local"))
+        roles = matrix.roles_superset_of("server-profile")
+        matrix.apply({"ops-l1": ["power-mgmt", "read-only"]})
+    """
+
+    def __init__(self, handle):
+        self.handle = handle
+        self._bits = {}
+        self._roles = None
+        self._users = None
+
+    def load(self):
+        """
+        Loads the roles and the roles of the users
+        """
+
+        query_data = self.handle.query_classids("AaaRole", "AaaUserRole")
+        self._roles = {}
+        for mo in query_data["AaaRole"]:
+            self._roles[mo.name] = (mo, self.mask(mo.priv))
+
+        # {(kind, name): set of roles}, a local and a remote user may
+        # have the same name
+        self._users = {}
+        for mo in query_data["AaaUserRole"]:
+            parent_rn = mo.dn.split("/")[2]
+            # roles of ldap group maps are not roles of a user
+            for kind, prefix in [("local", "user-"),
+                                 ("remote", "remoteuser-")]:
+                if parent_rn.startswith(prefix):
+                    user = (kind, parent_rn[len(prefix):])
+                    self._users.setdefault(user, set()).add(mo.name)
+
+    def _loaded(self):
+        if self._roles is None:
+            self.load()
+
+    def mask(self, privs):
+        """
+        Returns the bitset of privileges, as a list or a comma separated
+        string
+        """
+
+        mask = 0
+        for priv in sorted(_priv_set(privs)):
+            if priv not in self._bits:
+                self._bits[priv] = 1 << len(self._bits)
+            mask |= self._bits[priv]
+        return mask
+
+    def privs(self, mask):
+        """
+        Returns the privileges of a bitset
+        """
+
+        return set(priv for priv, bit in self._bits.items() if mask & bit)
+
+    def _role_mask(self, role):
+        self._loaded()
+        if role not in self._roles:
+            raise ValueError("Role '%s' does not exist" % role)
+        return self._roles[role][1]
+
+    def roles(self):
+        """
+        Returns {role: set of privileges}
+        """
+
+        self._loaded()
+        return dict((name, self.privs(mask))
+                    for name, (mo, mask) in self._roles.items())
+
+    def roles_with(self, priv):
+        """
+        Returns the roles which grant a privilege
+        """
+
+        bit = self.mask(priv)
+        self._loaded()
+        return sorted(name for name, (mo, mask) in self._roles.items()
+                      if mask & bit)
+
+    def roles_superset_of(self, role):
+        """
+        Returns the other roles which grant every privilege of a role
+        """
+
+        wanted = self._role_mask(role)
+        return sorted(name for name, (mo, mask) in self._roles.items()
+                      if name != role and mask & wanted == wanted)
+
+    def roles_subset_of(self, role):
+        """
+        Returns the other roles whose privileges are all granted by a role
+        """
+
+        wanted = self._role_mask(role)
+        return sorted(name for name, (mo, mask) in self._roles.items()
+                      if name != role and mask & wanted == mask)
+
+    def user_mask(self, user, kind="local"):
+        """
+        Returns the bitset of the privileges granted to a user by its
+        roles, kind is "local" or "remote"
+        """
+
+        self._loaded()
+        mask = 0
+        for role in self._users.get((kind, user), ()):
+            if role in self._roles:
+                mask |= self._roles[role][1]
+        return mask
+
+    def users_with(self, priv):
+        """
+        Returns [(kind, name)] of the local and remote users holding a
+        privilege, kind is "local" or "remote"
+        """
+
+        bit = self.mask(priv)
+        self._loaded()
+        return sorted((kind, user) for kind, user in self._users
+                      if self.user_mask(user, kind) & bit)
+
+    def diff(self, desired):
+        """
+        Compares the roles against a desired matrix
+
+        Args:
+            desired (dict): {role: privileges, as a list or a comma
+                             separated string}
+
+        Returns:
+            dict: {role: {"added": set of privileges,
+                          "removed": set of privileges}} for every role
+                  which differs or does not exist
+        """
+
+        self._loaded()
+        diff = {}
+        for role, privs in desired.items():
+            wanted = self.mask(privs)
+            current = self._roles[role][1] if role in self._roles else 0
+            if role not in self._roles or current != wanted:
+                diff[role] = {"added": self.privs(wanted & ~current),
+                              "removed": self.privs(current & ~wanted)}
+        return diff
+
+    def apply(self, desired, prune=False, dry_run=False):
+        """
+        Creates and modifies roles so that they match a desired matrix, in
+        a single commit. Privileges are compared as sets.
+
+        Args:
+            desired (dict): refer diff
+            prune (bool): if True, the roles which are not in the matrix
+                          are removed, except the built-in roles
+            dry_run (bool): if True, only computes the changes
+
+        Returns:
+            dict: {"created": [role], "modified": {role: {"added": set,
+                   "removed": set}}, "removed": [role], "commits": int}
+        """
+
+        from ucsmsdk.mometa.aaa.AaaRole import AaaRole
+
+        diff = self.diff(desired)
+        report = {"created": [], "modified": {}, "removed": [],
+                  "commits": 0}
+        staged = []
+        for role, change in sorted(diff.items()):
+            priv = ",".join(sorted(_priv_set(desired[role])))
+            # the cached role is only updated once committed
+            mo = AaaRole(parent_mo_or_dn="sys/user-ext", name=role,
+                         priv=priv)
+            if role in self._roles:
+                staged.append(("set", role, mo))
+                report["modified"][role] = change
+            else:
+                staged.append(("add", role, mo))
+                report["created"].append(role)
+
+        if prune:
+            for role in sorted(set(self._roles) - set(desired)):
+                if role not in _BUILTIN_ROLES:
+                    staged.append(("remove", role, self._roles[role][0]))
+                    report["removed"].append(role)
+
+        if not staged or dry_run:
+            return report
+
+        for action, role, mo in staged:
+            if action == "add":
+                self.handle.add_mo(mo, True)
+            elif action == "set":
+                self.handle.set_mo(mo)
+            else:
+                self.handle.remove_mo(mo)
+        self.handle.commit()
+        report["commits"] = 1
+        ldap_group_map_invalidate(self.handle)
+
+        for action, role, mo in staged:
+            if action == "remove":
+                del self._roles[role]
+            elif action == "set":
+                cached = self._roles[role][0]
+                cached.priv = mo.priv
+                self._roles[role] = (cached, self.mask(mo.priv))
+            else:
+                self._roles[role] = (mo, self.mask(mo.priv))
+        return report
@@ -15,6 +15,10 @@
 This module performs the operation related to snmp server, user and traps.
 """
 
+import logging
+
+log = logging.getLogger('ucs')
+
 
 def snmp_enable(handle, community=None, sys_contact=None, sys_location=None,
                 descr=None, is_set_snmp_secure=None):
@@ -409,3 +413,159 @@ def snmp_user_remove(handle, name):
 
     handle.remove_mo(mo)
     handle.commit()
+
+
+_SNMP_ROTATE_USER_PROPS = ["pwd", "privpwd", "auth", "use_aes"]
+_SNMP_ROTATE_TRAP_PROPS = ["community", "port", "version",
+                           "notification_type", "v3_privilege"]
+# secrets are not read back by the verification
+_SNMP_SECRETS = ["community", "pwd", "privpwd"]
+
+
+def _snmp_rotate_domain(handle, users, traps):
+    """
+    Rotates the snmp users and traps of one domain in a single commit and
+    verifies them with a single query
+
+    Returns:
+        dict: {"rotated": [dn], "missing": [dn]}
+
+    Raises:
+        ValueError: If the read back does not match
+    """
+
+    from ucsmsdk_samples.bulk import mo_diff
+
+    class_ids = ["CommSnmpUser", "CommSnmpTrap"]
+    query_data = handle.query_classids(class_ids)
+    existing = {}
+    for class_id in class_ids:
+        for mo in query_data[class_id]:
+            existing[mo.dn] = mo
+
+    desired = {}
+    for name, props in users.items():
+        dn = "sys/svc-ext/snmp-svc/snmpv3-user-" + name
+        desired[dn] = dict((prop, props.get(prop))
+                           for prop in _SNMP_ROTATE_USER_PROPS)
+    for hostname, props in traps.items():
+        dn = "sys/svc-ext/snmp-svc/snmp-trap" + hostname
+        desired[dn] = dict((prop, props.get(prop))
+                           for prop in _SNMP_ROTATE_TRAP_PROPS)
+
+    result = {"rotated": [], "missing": []}
+    for dn, props in sorted(desired.items()):
+        mo = existing.get(dn)
+        if mo is None:
+            result["missing"].append(dn)
+            continue
+        for prop, value in props.items():
+            if value is not None:
+                setattr(mo, prop, str(value))
+        handle.set_mo(mo)
+        result["rotated"].append(dn)
+
+    if not result["rotated"]:
+        return result
+    handle.commit()
+
+    query_data = handle.query_classids(class_ids)
+    current = {}
+    for class_id in class_ids:
+        for mo in query_data[class_id]:
+            current[mo.dn] = mo
+    for dn in result["rotated"]:
+        props = dict((prop, value) for prop, value in desired[dn].items()
+                     if prop not in _SNMP_SECRETS)
+        if dn not in current or mo_diff(current[dn], props):
+            raise ValueError("'%s' does not match after the rotation" % dn)
+    return result
+
+
+def snmp_rotate(handles, users=None, traps=None, max_workers=8, retries=3,
+                backoff=5):
+    """
+    Rotates SNMPv3 user credentials and snmp trap communities on many ucs
+    domains in parallel. Every domain is updated with a single commit and
+    verified with a single read back query. Domains which fail are retried
+    with an exponential backoff.
+
+    Args:
+        handles (list of UcsHandle): logged in handles
+        users (dict): {name: {prop: value}}
+            props : pwd, privpwd, auth, use_aes
+        traps (dict): {hostname: {prop: value}}
+            props : community, port, version, notification_type,
+                    v3_privilege
+        max_workers (int): maximum domains processed at the same time
+        retries (int): maximum retries of a failed domain
+        backoff (int): seconds before the first retry, doubled for every
+                       further retry
+
+    Returns:
+        dict: {"domains": {handle.ip: {"rotated": [dn], "missing": [dn],
+                                       "error": string, None on success,
+                                       "attempts": int,
+                                       "latency": seconds}},
+               "succeeded": [handle.ip], "failed": [handle.ip],
+               "latency": {"min": seconds, "max": seconds,
+                           "mean": seconds}}
+            users and traps which do not exist on a domain are reported as
+            missing and are not created
+
+    Example:
+        report = snmp_rotate(
+            handles,
+            users={"nms": {"pwd": "NewAuthPass1", "privpwd": "NewPrivPass1"}},
+            traps={"10.0.0.162": {"community": "NewTrapComm"}},
+            max_workers=10)
+    """
+
+    import time
+
+    from ucsmsdk_samples.bulk import run_on_handles
+
+    users = users or {}
+    traps = traps or {}
+
+    domains = {}
+    pending = list(handles)
+    for attempt in range(retries + 1):
+        if attempt:
+            delay = backoff * 2 ** (attempt - 1)
+            log.debug("Retrying snmp rotation of %d domains in %ds",
+                      len(pending), delay)
+            time.sleep(delay)
+
+        results = run_on_handles(
+            pending, lambda handle: _snmp_rotate_domain(handle, users, traps),
+            max_workers)
+
+        failed = []
+        for handle in pending:
+            entry = results[handle.ip]
+            domain = domains.setdefault(handle.ip, {"rotated": [],
+                                                    "missing": [],
+                                                    "attempts": 0,
+                                                    "latency": 0})
+            domain["attempts"] += 1
+            domain["latency"] += entry["latency"]
+            domain["error"] = entry["error"]
+            if entry["error"] is None:
+                domain.update(entry["result"])
+            else:
+                failed.append(handle)
+        pending = failed
+        if not pending:
+            break
+
+    latencies = [domain["latency"] for domain in domains.values()]
+    report = {"domains": domains,
+              "succeeded": sorted(ip for ip, domain in domains.items()
+                                  if domain["error"] is None),
+              "failed": sorted(ip for ip, domain in domains.items()
+                               if domain["error"] is not None),
+              "latency": {"min": min(latencies or [0]),
+                          "max": max(latencies or [0]),
+                          "mean": sum(latencies) / max(len(latencies), 1)}}
+    return report
@@ -326,3 +326,119 @@ def syslog_source(handle, faults=None, audits=None, events=None):
     handle.set_mo(mo)
     handle.commit()
     return mo
+
+
+_SYSLOG_DN = "sys/svc-ext/syslog"
+
+# {section: rn} of the syslog objects which always exist
+_SYSLOG_LOCAL = {"console": "console", "monitor": "monitor", "file": "file",
+                 "source": "source"}
+
+
+def syslog_changes(mos, desired, prune=False):
+    """
+    Computes the changes which bring the syslog objects to a desired state
+
+    Args:
+        mos (dict): {dn: mo} of the CommSyslog* objects
+        desired (dict): refer syslog_reconcile
+        prune (bool): refer syslog_reconcile
+
+    Returns:
+        list: [(mo, {prop: (current, desired)})], the props of mo are
+              already set to the desired values
+
+    Raises:
+        ValueError: If a syslog object or property does not exist
+
+    Example:
+        changes = syslog_changes(mos, {"console": {"severity": "alerts"}})
+    """
+
+    from ucsmsdk.mometa.comm.CommSyslogClient import CommSyslogClientConsts
+    from ucsmsdk_samples.bulk import mo_diff
+
+    wanted = {}
+    for section, props in desired.items():
+        if section == "clients":
+            for name, client_props in (props or {}).items():
+                wanted[_SYSLOG_DN + "/client-" + name] = client_props
+        elif section in _SYSLOG_LOCAL:
+            wanted[_SYSLOG_DN + "/" + _SYSLOG_LOCAL[section]] = props or {}
+        else:
+            raise ValueError("Invalid syslog section '%s'" % section)
+
+    if prune:
+        for dn, mo in mos.items():
+            if mo.get_class_id() == "CommSyslogClient" and dn not in wanted:
+                wanted[dn] = {"admin_state":
+                              CommSyslogClientConsts.ADMIN_STATE_DISABLED}
+
+    changes = []
+    for dn, props in sorted(wanted.items()):
+        mo = mos.get(dn)
+        if mo is None:
+            raise ValueError("'%s' does not exist" % dn)
+        for prop in props:
+            if prop not in mo.prop_meta:
+                raise ValueError("'%s' is not a property of %s" %
+                                 (prop, mo.get_class_id()))
+        diff = mo_diff(mo, props)
+        if diff:
+            for prop, (current, value) in diff.items():
+                setattr(mo, prop, value)
+            changes.append((mo, diff))
+    return changes
+
+
+def syslog_reconcile(handle, desired, prune=False, dry_run=False):
+    """
+    Configures the local and remote syslog destinations and the syslog
+    sources. Every syslog object is read with a single hierarchical query
+    and the changes are pushed in a single commit.
+
+    Args:
+        handle (UcsHandle)
+        desired (dict): {"console": {prop: value},
+                         "monitor": {prop: value},
+                         "file": {prop: value},
+                         "source": {prop: value},
+                         "clients": {"primary" or "secondary" or
+                                     "tertiary": {prop: value}}}
+            console, monitor props : admin_state, severity
+            file props : admin_state, name, severity, size
+            source props : faults, audits, events
+            clients props : admin_state, hostname, severity,
+                            forwarding_facility
+        prune (bool): if True, the remote destinations which are not in
+                      desired are disabled
+        dry_run (bool): if True, only computes the changes
+
+    Returns:
+        dict: {"modified": {dn: {prop: (current, desired)}}, "commits": int}
+
+    Raises:
+        ValueError: If a syslog object or property does not exist
+
+    Example:
+        syslog_reconcile(handle, {
+            "clients": {"primary": {"admin_state": "enabled",
+                                    "hostname": "10.1.1.50",
+                                    "severity": "warnings"}},
+            "source": {"faults": "enabled", "audits": "enabled",
+                       "events": "disabled"}},
+            prune=True)
+    """
+
+    mos = dict((mo.dn, mo) for mo in handle.query_dn(_SYSLOG_DN,
+                                                     hierarchy=True) or [])
+    changes = syslog_changes(mos, desired, prune)
+
+    report = {"modified": dict((mo.dn, diff) for mo, diff in changes),
+              "commits": 0}
+    if changes and not dry_run:
+        for mo, diff in changes:
+            handle.set_mo(mo)
+        handle.commit()
+        report["commits"] = 1
+    return report
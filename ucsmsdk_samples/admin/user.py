@@ -519,3 +519,273 @@ def password_profile_modify(handle, change_interval=None,
     handle.set_mo(mo)
     handle.commit()
     return mo
+
+
+_USER_EXT_DN = "sys/user-ext"
+# managed when they are props of AaaUser in the installed sdk
+_USER_PROPS = ["first_name", "last_name", "descr", "clear_pwd_history",
+               "phone", "email", "expires", "pwd_life_time", "expiration",
+               "account_status"]
+_USER_ROW_KEYS = ["name", "action", "pwd", "roles", "locales"]
+
+
+def _user_props():
+    """
+    Returns the props of _USER_PROPS supported by the installed sdk
+    """
+
+    from ucsmsdk.mometa.aaa.AaaUser import AaaUser
+
+    return [prop for prop in _USER_PROPS if prop in AaaUser.prop_meta]
+
+
+def user_rows_csv(file_obj):
+    """
+    Reads user rows from a csv file, one row at a time. Empty cells are
+    not managed. Roles and locales are separated by ';'.
+
+    Args:
+        file_obj (file): csv file with a header row, refer user_import
+                         for the columns
+
+    Returns:
+        generator of dict
+
+    Example:
+        with open("users.csv") as f:
+            user_import(handle, user_rows_csv(f))
+    """
+
+    import csv
+
+    for row in csv.DictReader(file_obj):
+        row = dict((key, value.strip()) for key, value in row.items()
+                   if key and value and value.strip())
+        for key in ["roles", "locales"]:
+            if key in row:
+                row[key] = [name.strip() for name in row[key].split(";")
+                            if name.strip()]
+        yield row
+
+
+def user_rows_jsonl(file_obj):
+    """
+    Reads user rows from a file with one json object per line
+
+    Args:
+        file_obj (file): refer user_import for the keys
+
+    Returns:
+        generator of dict
+
+    Example:
+        with open("users.jsonl") as f:
+            user_import(handle, user_rows_jsonl(f))
+    """
+
+    import json
+
+    for line in file_obj:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _user_row_changes(row, current, props):
+    """
+    Returns (outcome, changes, [(action, mo)], state) for a row, given the
+    current state of the user, None if the user does not exist. state is
+    the state of the user once the changes are committed. current is not
+    modified.
+
+    Raises:
+        ValueError: If the row has a column which is not supported
+    """
+
+    from ucsmsdk.mometa.aaa.AaaUser import AaaUser
+    from ucsmsdk.mometa.aaa.AaaUserRole import AaaUserRole
+    from ucsmsdk.mometa.aaa.AaaUserLocale import AaaUserLocale
+
+    for key in row:
+        if key not in _USER_ROW_KEYS and key not in props:
+            raise ValueError("'%s' is not a supported column" % key)
+
+    name = row["name"]
+    user_dn = "%s/user-%s" % (_USER_EXT_DN, name)
+
+    if row.get("action", "present") == "absent":
+        if current is None:
+            return "unchanged", {}, [], None
+        user = AaaUser(parent_mo_or_dn=_USER_EXT_DN, name=name)
+        return "deleted", {}, [("remove", user)], None
+
+    desired = dict((prop, str(value)) for prop, value in
+                   ((prop, row.get(prop)) for prop in props)
+                   if value is not None)
+    if current is None:
+        user = AaaUser(parent_mo_or_dn=_USER_EXT_DN, name=name,
+                       pwd=row.get("pwd"), **desired)
+        state = {"props": desired,
+                 "roles": set(row.get("roles") or ["read-only"]),
+                 "locales": set(row.get("locales") or [])}
+        for role in sorted(state["roles"]):
+            AaaUserRole(parent_mo_or_dn=user, name=role)
+        for locale in sorted(state["locales"]):
+            AaaUserLocale(parent_mo_or_dn=user, name=locale)
+        return "created", {}, [("add", user)], state
+
+    state = {"props": dict(current["props"]),
+             "roles": set(current["roles"]),
+             "locales": set(current["locales"])}
+    staged = []
+    changes = dict((prop, (current["props"].get(prop), value))
+                   for prop, value in desired.items()
+                   if current["props"].get(prop) != value)
+    if changes:
+        values = dict((prop, value) for prop, (old, value) in changes.items())
+        staged.append(("set", AaaUser(parent_mo_or_dn=_USER_EXT_DN,
+                                      name=name, **values)))
+        state["props"].update(values)
+
+    for key, class_ in [("roles", AaaUserRole), ("locales", AaaUserLocale)]:
+        if row.get(key) is None:
+            continue
+        wanted = set(row[key])
+        if wanted == state[key]:
+            continue
+        changes[key] = (sorted(state[key]), sorted(wanted))
+        for child in sorted(wanted - state[key]):
+            staged.append(("add", class_(parent_mo_or_dn=user_dn,
+                                         name=child)))
+        for child in sorted(state[key] - wanted):
+            staged.append(("remove", class_(parent_mo_or_dn=user_dn,
+                                            name=child)))
+        state[key] = wanted
+
+    if not staged:
+        return "unchanged", {}, [], current
+    return "modified", changes, staged, state
+
+
+def user_import(handle, rows, chunk_size=50, dry_run=False, sink=None):
+    """
+    Creates, modifies and deletes local users from a stream of rows. The
+    users, roles and locales are loaded in a single query and the rows are
+    applied in chunked commits, so memory is bounded by the chunk size and
+    the number of existing users. A chunk is committed early when a user
+    appears again in it, so every row is diffed against committed state.
+
+    Args:
+        handle (UcsHandle)
+        rows (iterable of dict): one row per user, refer user_rows_csv and
+                                 user_rows_jsonl
+            keys : name, action ("present" or "absent", default "present"),
+                   first_name, last_name, descr, clear_pwd_history, phone,
+                   email, expires, pwd_life_time, expiration,
+                   account_status, pwd, roles (list), locales (list)
+            pwd is only used when the user is created. If roles or locales
+            are given, the user ends up with exactly these. A row with a
+            column which is not a prop of AaaUser in the installed sdk
+            fails.
+        chunk_size (int): maximum rows per commit
+        dry_run (bool): if True, only computes the outcome of the rows
+        sink (callable): called with the list of row outcomes of every
+                         chunk. If None, the outcomes are returned.
+
+    Returns:
+        dict: {"created": int, "modified": int, "deleted": int,
+               "unchanged": int, "failed": int, "commits": int,
+               "rows": [{"row": int, "name": string, "outcome": string,
+                         "changes": dict, "error": string}]}
+              "rows" is only returned if sink is None
+
+    Example:
+        with open("users.csv") as f:
+            report = user_import(handle, user_rows_csv(f), chunk_size=100)
+    """
+
+    from ucsmsdk.ucsexception import UcsException
+    from ucsmsdk_samples.bulk import commit_in_chunks
+
+    if chunk_size < 1:
+        raise ValueError("chunk size must be at least 1")
+
+    props = _user_props()
+    query_data = handle.query_classids("AaaUser", "AaaUserRole",
+                                       "AaaUserLocale")
+    # {name: {"props": {prop: value}, "roles": set, "locales": set}}
+    users = {}
+    for mo in query_data["AaaUser"]:
+        users[mo.name] = {
+            "props": dict((prop, getattr(mo, prop)) for prop in props
+                          if getattr(mo, prop, None) is not None),
+            "roles": set(), "locales": set()}
+    user_prefix = _USER_EXT_DN + "/user-"
+    for class_id, key in [("AaaUserRole", "roles"),
+                          ("AaaUserLocale", "locales")]:
+        for mo in query_data[class_id]:
+            # remote users and ldap groups have roles and locales too
+            if not mo.dn.startswith(user_prefix):
+                continue
+            name = mo.dn[len(user_prefix):].split("/", 1)[0]
+            if name in users:
+                users[name][key].add(mo.name)
+
+    report = {"created": 0, "modified": 0, "deleted": 0, "unchanged": 0,
+              "failed": 0, "commits": 0}
+    outcomes = []
+    chunk = {"outcomes": [], "staged": [], "states": {}}
+
+    def _flush():
+        outcomes_ = chunk["outcomes"]
+        staged = chunk["staged"]
+        failed = False
+        if staged and not dry_run:
+            try:
+                report["commits"] += commit_in_chunks(handle, staged,
+                                                      len(staged))
+            except UcsException as e:
+                failed = True
+                for outcome in outcomes_:
+                    if outcome["outcome"] != "unchanged":
+                        outcome["outcome"] = "failed"
+                        outcome["error"] = str(e)
+        if not failed:
+            # the snapshot only holds committed state
+            for name, state in chunk["states"].items():
+                if state is None:
+                    users.pop(name, None)
+                else:
+                    users[name] = state
+
+        for outcome in outcomes_:
+            report[outcome["outcome"]] += 1
+        if sink is None:
+            outcomes.extend(outcomes_)
+        elif outcomes_:
+            sink(outcomes_)
+        chunk.update({"outcomes": [], "staged": [], "states": {}})
+
+    for row_num, row in enumerate(rows, 1):
+        name = row.get("name")
+        if name in chunk["states"] or len(chunk["outcomes"]) == chunk_size:
+            _flush()
+        outcome = {"row": row_num, "name": name, "outcome": "unchanged",
+                   "changes": {}, "error": None}
+        try:
+            if not name:
+                raise ValueError("name is missing")
+            (outcome["outcome"], outcome["changes"], staged,
+             state) = _user_row_changes(row, users.get(name), props)
+            if staged:
+                chunk["staged"].extend(staged)
+                chunk["states"][name] = state
+        except (KeyError, ValueError) as e:
+            outcome["outcome"] = "failed"
+            outcome["error"] = str(e)
+        chunk["outcomes"].append(outcome)
+    _flush()
+
+    if sink is None:
+        report["rows"] = outcomes
+    return report
@@ -0,0 +1,286 @@
+# Copyright 2015 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains helpers shared by the bulk query and reconcile methods.
+"""
+
+
+def mo_diff(mo, desired):
+    """
+    Compares the properties of a managed object against desired values
+
+    Args:
+        mo (ManagedObject): queried object, None if it does not exist
+        desired (dict): {prop: value}, props with value None are ignored
+
+    Returns:
+        dict: {prop: (current_value, desired_value)} for every prop
+              that differs
+
+    Example:
+        diff = mo_diff(mo, {"cos": "5", "drop": "no-drop"})
+    """
+
+    diff = {}
+    for prop, value in desired.items():
+        if value is None:
+            continue
+        value = str(value)
+        current = getattr(mo, prop, None) if mo is not None else None
+        if current != value:
+            diff[prop] = (current, value)
+    return diff
+
+
+def mo_set(mo, desired, changes, report=None, mos=None):
+    """
+    Sets the properties of a managed object which differ from desired
+    values and stages the object for commit_in_chunks
+
+    Args:
+        mo (ManagedObject or string): object, or dn of an object of mos
+        desired (dict): {prop: value}, refer mo_diff
+        changes (list): staged changes, refer commit_in_chunks
+        report (dict): optional, the diff is added to report["modified"]
+                       under the dn, and the dn to report["unchanged"] if
+                       there is no diff and report has that key
+        mos (dict): {dn: mo}, used when mo is a dn
+
+    Returns:
+        dict: {prop: (current_value, desired_value)}, refer mo_diff
+
+    Raises:
+        ValueError: If mo is a dn which is not in mos
+
+    Example:
+        mo_set("sys/svc-ext/datetime-svc", {"timezone": "Europe/Paris"},
+               changes, report, mos=existing)
+    """
+
+    if not hasattr(mo, "dn"):
+        dn = mo
+        mo = (mos or {}).get(dn)
+        if mo is None:
+            raise ValueError("'%s' does not exist" % dn)
+
+    diff = mo_diff(mo, desired)
+    if diff:
+        for prop, (current, value) in diff.items():
+            setattr(mo, prop, value)
+        changes.append(("set", mo))
+        if report is not None:
+            report["modified"][mo.dn] = diff
+    elif report is not None and "unchanged" in report:
+        report["unchanged"].append(mo.dn)
+    return diff
+
+
+def chunks(items, size):
+    """
+    Splits a list into lists of at most 'size' items. Items are read
+    lazily, so any iterable can be streamed.
+
+    Args:
+        items (iterable)
+        size (int)
+
+    Returns:
+        generator of list
+
+    Example:
+        for chunk in chunks(sp_dns, 50):
+            ...
+    """
+
+    if size < 1:
+        raise ValueError("chunk size must be at least 1")
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def commit_in_chunks(handle, changes, chunk_size=50):
+    """
+    Pushes configuration changes to UCSM, at most 'chunk_size' changes
+    per commit
+
+    Args:
+        handle (UcsHandle)
+        changes (list): [(action, mo)], action is one of
+                        "add", "set", "remove"
+        chunk_size (int): maximum changes per commit
+
+    Returns:
+        int: number of commits
+
+    Raises:
+        UcsException: If a commit fails. Changes of earlier chunks
+                      are already committed.
+
+    Example:
+        commit_in_chunks(handle, [("add", mo1), ("remove", mo2)],
+                         chunk_size=100)
+    """
+
+    commits = 0
+    for chunk in chunks(changes, chunk_size):
+        for action, mo in chunk:
+            if action == "add":
+                handle.add_mo(mo, modify_present=True)
+            elif action == "set":
+                handle.set_mo(mo)
+            elif action == "remove":
+                handle.remove_mo(mo)
+            else:
+                raise ValueError("Invalid action '%s'" % action)
+        handle.commit()
+        commits += 1
+    return commits
+
+
+def mo_config_props(mo, naming=True):
+    """
+    Returns the configurable properties of a managed object
+
+    Args:
+        mo (ManagedObject)
+        naming (bool): if False, naming props are not returned
+
+    Returns:
+        dict: {prop: value} of the naming, create-only and read-write props
+
+    Example:
+        props = mo_config_props(mo, naming=False)
+    """
+
+    from ucsmsdk.ucscoremeta import MoPropertyMeta
+
+    access = [MoPropertyMeta.CREATE_ONLY, MoPropertyMeta.READ_WRITE]
+    if naming:
+        access.append(MoPropertyMeta.NAMING)
+
+    props = {}
+    for prop, prop_meta in mo.prop_meta.items():
+        if prop == "status" or prop_meta.access not in access:
+            continue
+        value = getattr(mo, prop, None)
+        if value is not None:
+            props[prop] = value
+    return props
+
+
+def mo_copy(mo, parent_mo_or_dn, children=None, props=None):
+    """
+    Creates a copy of a managed object and its subtree under another parent
+
+    Args:
+        mo (ManagedObject): object to copy
+        parent_mo_or_dn (ManagedObject or string): parent of the copy
+        children (dict): {dn: [child mo]} subtree of mo, as returned by a
+                         hierarchical query. Default is mo.child.
+        props (dict): {prop: value} overriding the props of the copy,
+                      naming props included
+
+    Returns:
+        ManagedObject: the copy, only configurable props are copied
+
+    Example:
+        mo = mo_copy(ref_policy, "org-root/org-t1", props={"name": "t1"})
+    """
+
+    from ucsmsdk.ucscoreutils import load_class
+
+    copy_props = mo_config_props(mo)
+    copy_props.update(props or {})
+    copy = load_class(mo.get_class_id())(parent_mo_or_dn=parent_mo_or_dn,
+                                         **copy_props)
+    if children is None:
+        child_mos = mo.child
+    else:
+        child_mos = children.get(mo.dn, [])
+    for child in child_mos:
+        mo_copy(child, copy, children)
+    return copy
+
+
+def run_on_handles(handles, func, max_workers=8):
+    """
+    Runs a method on many ucs domains in parallel, using at most
+    'max_workers' threads
+
+    Args:
+        handles (list of UcsHandle): logged in handles
+        func (callable): called with a handle, its return value is reported
+        max_workers (int): maximum domains processed at the same time
+
+    Returns:
+        dict: {handle.ip: {"result": return value of func,
+                           "error": string, None on success,
+                           "latency": seconds}}
+
+    Example:
+        report = run_on_handles(
+            handles, lambda handle: comms_baseline_apply(handle, baseline),
+            max_workers=4)
+    """
+
+    import threading
+    import time
+
+    try:
+        import queue
+    except ImportError:
+        import Queue as queue
+
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    jobs = queue.Queue()
+    for handle in handles:
+        jobs.put(handle)
+
+    report = {}
+    report_lock = threading.Lock()
+
+    def worker():
+        while True:
+            try:
+                handle = jobs.get_nowait()
+            except queue.Empty:
+                return
+
+            entry = {"result": None, "error": None}
+            start = time.time()
+            try:
+                entry["result"] = func(handle)
+            except Exception as e:
+                entry["error"] = str(e)
+            entry["latency"] = time.time() - start
+
+            with report_lock:
+                report[handle.ip] = entry
+
+    threads = [threading.Thread(target=worker)
+               for i in range(min(max_workers, len(handles)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return report
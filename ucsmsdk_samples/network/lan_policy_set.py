@@ -0,0 +1,163 @@
+# Copyright 2015 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module applies a set of Multicast Policies and Network Control Policies
+to many orgs at once.
+"""
+
+import logging
+
+log = logging.getLogger('ucs')
+
+_MCAST_PROPS = ["querier_state", "snooping_state", "querier_ip_addr",
+                "querier_ip_addr_peer", "descr"]
+_NWCTRL_PROPS = ["cdp", "mac_register_mode", "uplink_fail_action",
+                 "lldp_transmit", "lldp_receive", "descr"]
+
+
+def lan_policy_set_apply(handle, org_dns, mcast_policies=None,
+                         nwctrl_policies=None, chunk_size=50,
+                         dry_run=False):
+    """
+    Creates or modifies Multicast Policies and Network Control Policies in
+    many orgs. The current policies are loaded in a single query and only
+    the policies which differ are pushed, in chunked commits.
+
+    Args:
+        handle (UcsHandle)
+        org_dns (list of string): orgs in which the policies should reside
+        mcast_policies (dict): {name: {prop: value}}
+            props : querier_state, snooping_state, querier_ip_addr,
+                    querier_ip_addr_peer, descr
+        nwctrl_policies (dict): {name: {prop: value}}
+            props : cdp, mac_register_mode, uplink_fail_action, forge,
+                    lldp_transmit, lldp_receive, descr
+        chunk_size (int): maximum changes per commit
+        dry_run (bool): if True, only computes the diff
+
+    Returns:
+        dict: {"created": [dn], "modified": {dn: {prop: (current, desired)}},
+               "unchanged": [dn], "commits": int}
+
+    Raises:
+        ValueError: If OrgOrg is not present
+
+    Example:
+        report = lan_policy_set_apply(
+            handle, ["org-root/org-t1", "org-root/org-t2"],
+            mcast_policies={"mcast": {"querier_state": "disabled",
+                                      "snooping_state": "enabled"}},
+            nwctrl_policies={"cdp-on": {"cdp": "enabled",
+                                        "forge": "allow"}})
+    """
+
+    from ucsmsdk.mometa.fabric.FabricMulticastPolicy import \
+        FabricMulticastPolicy
+    from ucsmsdk.mometa.nwctrl.NwctrlDefinition import NwctrlDefinition
+    from ucsmsdk.mometa.dpsec.DpsecMac import DpsecMac
+    from ucsmsdk_samples.bulk import mo_diff, commit_in_chunks
+
+    mcast_policies = mcast_policies or {}
+    nwctrl_policies = nwctrl_policies or {}
+
+    query_data = handle.query_classids("OrgOrg", "FabricMulticastPolicy",
+                                       "NwctrlDefinition", "DpsecMac")
+    orgs = set(mo.dn for mo in query_data["OrgOrg"])
+    existing = {}
+    for class_id in ["FabricMulticastPolicy", "NwctrlDefinition",
+                     "DpsecMac"]:
+        for mo in query_data[class_id]:
+            existing[mo.dn] = mo
+
+    for org_dn in org_dns:
+        if org_dn not in orgs:
+            raise ValueError("org '%s' is not available" % org_dn)
+
+    report = {"created": [], "modified": {}, "unchanged": [], "commits": 0}
+    changes = []
+
+    for org_dn in org_dns:
+        for name, props in sorted(mcast_policies.items()):
+            dn = org_dn + "/mc-policy-" + name
+            desired = dict((prop, props.get(prop)) for prop in _MCAST_PROPS)
+            mo = existing.get(dn)
+            if mo is None:
+                mo = FabricMulticastPolicy(parent_mo_or_dn=org_dn,
+                                           name=name,
+                                           policy_owner="local")
+                for prop, value in desired.items():
+                    if value is not None:
+                        setattr(mo, prop, str(value))
+                changes.append(("add", mo))
+                report["created"].append(dn)
+                continue
+
+            diff = mo_diff(mo, desired)
+            if not diff:
+                report["unchanged"].append(dn)
+                continue
+            for prop, (current, value) in diff.items():
+                setattr(mo, prop, value)
+            changes.append(("set", mo))
+            report["modified"][dn] = diff
+
+        for name, props in sorted(nwctrl_policies.items()):
+            dn = org_dn + "/nwctrl-" + name
+            desired = dict((prop, props.get(prop)) for prop in _NWCTRL_PROPS)
+            forge = props.get("forge")
+            mo = existing.get(dn)
+            if mo is None:
+                mo = NwctrlDefinition(parent_mo_or_dn=org_dn,
+                                      name=name,
+                                      policy_owner="local")
+                for prop, value in desired.items():
+                    if value is not None:
+                        setattr(mo, prop, str(value))
+                if forge is not None:
+                    DpsecMac(parent_mo_or_dn=mo, forge=forge,
+                             policy_owner="local", name="", descr="")
+                changes.append(("add", mo))
+                report["created"].append(dn)
+                continue
+
+            diff = mo_diff(mo, desired)
+            for prop, (current, value) in diff.items():
+                setattr(mo, prop, value)
+            if diff:
+                changes.append(("set", mo))
+
+            mac_sec = existing.get(dn + "/mac-sec")
+            forge_diff = mo_diff(mac_sec, {"forge": forge})
+            if forge_diff:
+                if mac_sec is None:
+                    mac_sec = DpsecMac(parent_mo_or_dn=dn, forge=forge,
+                                       policy_owner="local", name="",
+                                       descr="")
+                    changes.append(("add", mac_sec))
+                else:
+                    mac_sec.forge = forge
+                    changes.append(("set", mac_sec))
+                diff.update(forge_diff)
+
+            if diff:
+                report["modified"][dn] = diff
+            else:
+                report["unchanged"].append(dn)
+
+    log.debug("Policy set: %d created, %d modified, %d unchanged",
+              len(report["created"]), len(report["modified"]),
+              len(report["unchanged"]))
+    if not dry_run:
+        report["commits"] = commit_in_chunks(handle, changes, chunk_size)
+    return report
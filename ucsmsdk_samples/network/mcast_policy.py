@@ -88,9 +88,9 @@ def mcast_policy_exists(handle, name, snooping_state=None, querier_state=None,
     dn = parent_dn + '/mc-policy-' + name
     mo = handle.query_dn(dn)
     if mo:
-        if ((snooping_state and mo.snooping_state != snooping_state) and
-                (querier_state and mo.querier_state != querier_state) and
-                (querier_ip_addr and mo.querier_ip_addr != querier_ip_addr) and
+        if ((snooping_state and mo.snooping_state != snooping_state) or
+                (querier_state and mo.querier_state != querier_state) or
+                (querier_ip_addr and mo.querier_ip_addr != querier_ip_addr) or
                 (descr and mo.descr != descr)):
             return False
         return True
@@ -135,15 +135,19 @@ def nw_control_policy_exists(handle, name, cdp=None, mac_register_mode=None,
     dn = parent_dn + '/nwctrl-' + name
     mo = handle.query_dn(dn)
     if mo:
-        if ((cdp and mo.cdp != cdp) and
+        if ((cdp and mo.cdp != cdp) or
             (mac_register_mode and mo.mac_register_mode
-                != mac_register_mode) and
+                != mac_register_mode) or
             (uplink_fail_action and mo.uplink_fail_action
-                != uplink_fail_action) and
-            (forge and mo.forge != forge) and
-            (lldp_transmit and mo.lldp_transmit != lldp_transmit) and
-            (lldp_receive and mo.lldp_receive != lldp_receive) and
+                != uplink_fail_action) or
+            (lldp_transmit and mo.lldp_transmit != lldp_transmit) or
+            (lldp_receive and mo.lldp_receive != lldp_receive) or
             (descr and mo.descr != descr)):
             return False
+        if forge:
+            # forge is a property of the mac security child
+            mac_sec = handle.query_dn(dn + '/mac-sec')
+            if not mac_sec or mac_sec.forge != forge:
+                return False
         return True
     return False
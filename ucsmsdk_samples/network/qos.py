@@ -278,3 +278,219 @@ def qos_policy_exists(handle, name, priority=None, burst=None, rate=None,
             return False
         return True
     return False
+
+
+_QOS_CLASS_IDS = ["QosclassEthClassified", "QosclassEthBE", "QosclassFc"]
+_QOS_EGRESS_PROPS = ["prio", "burst", "rate", "host_control"]
+
+
+def _qos_baseline_query(handle):
+    """
+    Fetches every QoS system class and QoS policy in one query
+
+    Returns:
+        (dict, dict): ({priority: Qosclass mo},
+                       {policy dn: [EpqosDefinition mo, EpqosEgress mo]})
+    """
+
+    import os
+
+    query_data = handle.query_classids(
+        _QOS_CLASS_IDS + ["EpqosDefinition", "EpqosEgress"])
+
+    classes = {}
+    for class_id in _QOS_CLASS_IDS:
+        for mo in query_data[class_id]:
+            priority = os.path.basename(mo.dn)[len("class-"):]
+            classes[priority] = mo
+
+    policies = {}
+    for mo in query_data["EpqosDefinition"]:
+        policies[mo.dn] = [mo, None]
+    for mo in query_data["EpqosEgress"]:
+        policy_dn = os.path.dirname(mo.dn)
+        if policy_dn in policies:
+            policies[policy_dn][1] = mo
+
+    return classes, policies
+
+
+def _qos_props_check(class_, props):
+    """
+    Checks that every prop of the baseline is a read-write prop of class_
+
+    Raises:
+        ValueError: If a prop does not exist or is not read-write
+    """
+
+    from ucsmsdk.ucscoremeta import MoPropertyMeta
+
+    for prop in props:
+        prop_meta = class_.prop_meta.get(prop)
+        if prop_meta is None:
+            raise ValueError("'%s' is not a property of %s" %
+                             (prop, class_.__name__))
+        if prop_meta.access != MoPropertyMeta.READ_WRITE:
+            raise ValueError("'%s' is not a read-write property of %s" %
+                             (prop, class_.__name__))
+
+
+def _qos_baseline_diff(classes, policies, baseline):
+    """
+    Computes the drift report of the queried QoS objects against a baseline
+
+    Raises:
+        ValueError: If QoS class in baseline is not available, or a prop of
+                    the baseline can not be configured
+    """
+
+    from ucsmsdk_samples.bulk import mo_diff
+
+    report = {"classes": {}, "policies": {}}
+
+    for priority, props in baseline.get("classes", {}).items():
+        mo = classes.get(priority)
+        if mo is None:
+            raise ValueError("QoS class %s is not available" % priority)
+        _qos_props_check(type(mo), props)
+
+    for policy_dn, props in baseline.get("policies", {}).items():
+        for prop in props:
+            if prop not in ["descr"] + _QOS_EGRESS_PROPS:
+                raise ValueError("'%s' is not a QoS policy property" % prop)
+
+    for priority, props in baseline.get("classes", {}).items():
+        mo = classes[priority]
+        if props.get("admin_state") == "disabled":
+            # props of a disabled class are not relevant
+            props = {"admin_state": "disabled"}
+        diff = mo_diff(mo, props)
+        if diff:
+            report["classes"][priority] = diff
+
+    for policy_dn, props in baseline.get("policies", {}).items():
+        policy, egress = policies.get(policy_dn, [None, None])
+        diff = mo_diff(policy, {"descr": props.get("descr")})
+        diff.update(mo_diff(egress, dict((prop, props.get(prop))
+                                         for prop in _QOS_EGRESS_PROPS)))
+        if diff:
+            report["policies"][policy_dn] = diff
+
+    return report
+
+
+def qos_baseline_drift(handle, baseline):
+    """
+    Detects configuration drift for all QoS System Classes and QoS Policies
+    against a baseline, using a single query
+
+    Args:
+        handle (UcsHandle)
+        baseline (dict): {"classes": {priority: {prop: value}},
+                          "policies": {policy_dn: {prop: value}}}
+            class props : admin_state, cos, drop, weight, mtu,
+                          multicast_optimize
+            policy props : descr, prio, burst, rate, host_control
+
+    Returns:
+        dict: {"classes": {priority: {prop: (current, desired)}},
+               "policies": {policy_dn: {prop: (current, desired)}}}
+               only drifted classes and policies are reported. A policy
+               which does not exist reports None as current value.
+
+    Raises:
+        ValueError: If QoS class in baseline is not available, or a prop of
+                    the baseline can not be configured
+
+    Example:
+        baseline = {
+            "classes": {
+                "platinum": {"admin_state": "enabled", "cos": "5",
+                             "drop": "no-drop", "weight": "10",
+                             "mtu": "9216"},
+                "best-effort": {"weight": "5", "mtu": "normal"},
+            },
+            "policies": {
+                "org-root/ep-qos-gold": {"prio": "gold",
+                                         "rate": "line-rate",
+                                         "burst": "10240",
+                                         "host_control": "none"},
+            },
+        }
+        drift = qos_baseline_drift(handle, baseline)
+    """
+
+    classes, policies = _qos_baseline_query(handle)
+    return _qos_baseline_diff(classes, policies, baseline)
+
+
+def qos_baseline_apply(handle, baseline):
+    """
+    Detects configuration drift for all QoS System Classes and QoS Policies
+    and remediates it in a single commit
+
+    Args:
+        handle (UcsHandle)
+        baseline (dict): refer qos_baseline_drift
+
+    Returns:
+        dict: drift report that was remediated, refer qos_baseline_drift
+
+    Raises:
+        ValueError: If QoS class in baseline is not available, or a prop of
+                    the baseline can not be configured
+
+    Example:
+        drift = qos_baseline_apply(handle, baseline)
+    """
+
+    import os
+
+    from ucsmsdk.mometa.epqos.EpqosDefinition import EpqosDefinition
+    from ucsmsdk.mometa.epqos.EpqosEgress import EpqosEgress
+
+    classes, policies = _qos_baseline_query(handle)
+    report = _qos_baseline_diff(classes, policies, baseline)
+
+    for priority, diff in report["classes"].items():
+        mo = classes[priority]
+        for prop, (current, desired) in diff.items():
+            setattr(mo, prop, desired)
+        handle.set_mo(mo)
+
+    for policy_dn, diff in report["policies"].items():
+        policy, egress = policies.get(policy_dn, [None, None])
+        policy_diff = dict((prop, desired)
+                           for prop, (current, desired) in diff.items()
+                           if prop not in _QOS_EGRESS_PROPS)
+        egress_diff = dict((prop, desired)
+                           for prop, (current, desired) in diff.items()
+                           if prop in _QOS_EGRESS_PROPS)
+
+        if policy is None:
+            policy = EpqosDefinition(
+                parent_mo_or_dn=os.path.dirname(policy_dn),
+                name=os.path.basename(policy_dn)[len("ep-qos-"):],
+                policy_owner="local",
+                **policy_diff)
+            EpqosEgress(parent_mo_or_dn=policy, name="", **egress_diff)
+            handle.add_mo(policy, modify_present=True)
+            continue
+
+        if policy_diff:
+            for prop, desired in policy_diff.items():
+                setattr(policy, prop, desired)
+            handle.set_mo(policy)
+        if egress_diff:
+            if egress is None:
+                egress = EpqosEgress(parent_mo_or_dn=policy_dn, name="",
+                                     **egress_diff)
+                handle.add_mo(egress, modify_present=True)
+            else:
+                for prop, desired in egress_diff.items():
+                    setattr(egress, prop, desired)
+                handle.set_mo(egress)
+
+    if report["classes"] or report["policies"]:
+        handle.commit()
+    return report
@@ -0,0 +1,265 @@
+# Copyright 2015 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains a collector which samples Ethernet and FC counters of
+the uplink, server and FC ports of the fabric interconnects.
+"""
+
+import collections
+import csv
+import json
+import logging
+import os
+import time
+
+log = logging.getLogger('ucs')
+
+# fabric port classes created by network/uplink_port.py,
+# network/server_port.py and their FC counterpart
+FABRIC_PORT_CLASS_IDS = ["FabricEthLanEp", "FabricDceSwSrvEp",
+                         "FabricFcSanEp"]
+
+STATS_COUNTERS = {
+    "EtherRxStats": ["total_bytes", "total_packets", "unicast_packets",
+                     "multicast_packets", "broadcast_packets",
+                     "jumbo_packets"],
+    "EtherTxStats": ["total_bytes", "total_packets", "unicast_packets",
+                     "multicast_packets", "broadcast_packets",
+                     "jumbo_packets"],
+    "EtherErrStats": ["align", "fcs", "rcv", "xmit", "under_size",
+                      "out_discard", "deferred_tx", "int_mac_rx",
+                      "int_mac_tx"],
+    "EtherPauseStats": ["recv_pause", "xmit_pause", "resets"],
+    "FcStats": ["bytes_rx", "bytes_tx", "packets_rx", "packets_tx"],
+    "FcErrStats": ["crc_rx", "discard_rx", "discard_tx", "link_failures",
+                   "signal_losses", "sync_losses", "rx", "tx",
+                   "too_long_rx", "too_short_rx"],
+}
+
+SAMPLE_FIELDS = ["time", "port_dn", "fabric_port_dn", "class_id", "counter",
+                 "value", "delta", "rate"]
+
+
+def fabric_port_dns(handle):
+    """
+    Returns the physical port dn of every configured uplink, server and FC
+    port, using a single query
+
+    Args:
+        handle (UcsHandle)
+
+    Returns:
+        dict: {physical port dn: fabric port dn}
+
+    Example:
+        ports = fabric_port_dns(handle)
+    """
+
+    query_data = handle.query_classids(FABRIC_PORT_CLASS_IDS)
+    ports = {}
+    for class_id in FABRIC_PORT_CLASS_IDS:
+        for mo in query_data[class_id]:
+            if mo.ep_dn:
+                ports[mo.ep_dn] = mo.dn
+    return ports
+
+
+def csv_sink(file_obj):
+    """
+    Returns a sink which writes port samples to a csv file
+
+    Args:
+        file_obj (file): file opened for writing
+
+    Returns:
+        callable
+
+    Example:
+        with open("stats.csv", "w") as f:
+            collector.run(interval=60, count=10, sink=csv_sink(f))
+    """
+
+    writer = csv.DictWriter(file_obj, fieldnames=SAMPLE_FIELDS)
+    writer.writeheader()
+
+    def sink(rows):
+        writer.writerows(rows)
+        file_obj.flush()
+    return sink
+
+
+def jsonl_sink(file_obj):
+    """
+    Returns a sink which writes port samples to a file, one json per line
+
+    Args:
+        file_obj (file): file opened for writing
+
+    Returns:
+        callable
+
+    Example:
+        with open("stats.jsonl", "w") as f:
+            collector.run(interval=60, count=10, sink=jsonl_sink(f))
+    """
+
+    def sink(rows):
+        for row in rows:
+            file_obj.write(json.dumps(row, sort_keys=True) + "\n")
+        file_obj.flush()
+    return sink
+
+
+class PortStatsCollector(object):
+    """
+    Samples port counters of the fabric ports and computes per interval
+    deltas and rates. The last 'history' samples of every port and stats
+    class are kept in a fixed size ring buffer.
+
+    Args:
+        handle (UcsHandle)
+        class_ids (list of string): stats classes to sample,
+                                    refer STATS_COUNTERS for supported
+                                    classes. Default is all.
+        history (int): number of samples kept per port and stats class
+        port_dns (dict): {physical port dn: fabric port dn},
+                         default is fabric_port_dns(handle)
+
+    Example:
+        collector = PortStatsCollector(handle,
+                                       class_ids=["EtherRxStats",
+                                                  "EtherTxStats"])
+        rows = collector.sample()
+        collector.run(interval=60, count=60, sink=jsonl_sink(f))
+    """
+
+    def __init__(self, handle, class_ids=None, history=60, port_dns=None):
+        self.handle = handle
+        self.class_ids = class_ids or sorted(STATS_COUNTERS)
+        for class_id in self.class_ids:
+            if class_id not in STATS_COUNTERS:
+                raise ValueError("stats class '%s' is not supported" %
+                                 class_id)
+        self.history = history
+        self.port_dns = port_dns
+        self._last = {}
+        self._ring = {}
+
+    def refresh_ports(self):
+        """
+        Reloads the configured fabric ports
+        """
+
+        self.port_dns = fabric_port_dns(self.handle)
+
+    def sample(self):
+        """
+        Queries all the stats classes once and computes the deltas and
+        rates against the previous sample.
+
+        Returns:
+            list of dict: one row per port, stats class and counter,
+                          refer SAMPLE_FIELDS. delta and rate are None for
+                          the first sample of a port.
+        """
+
+        if self.port_dns is None:
+            self.refresh_ports()
+
+        now = time.time()
+        query_data = self.handle.query_classids(self.class_ids)
+        rows = []
+        for class_id in self.class_ids:
+            counters = STATS_COUNTERS[class_id]
+            for mo in query_data[class_id]:
+                port_dn = os.path.dirname(mo.dn)
+                if port_dn not in self.port_dns:
+                    continue
+
+                key = (port_dn, class_id)
+                values = {}
+                for counter in counters:
+                    value = getattr(mo, counter, None)
+                    if value not in (None, ""):
+                        values[counter] = int(value)
+
+                last = self._last.get(key)
+                self._last[key] = (now, values)
+
+                sample = {}
+                for counter, value in values.items():
+                    delta = rate = None
+                    if last is not None and counter in last[1]:
+                        delta = value - last[1][counter]
+                        if delta < 0:
+                            # counters were cleared
+                            delta = value
+                        elapsed = now - last[0]
+                        rate = delta / elapsed if elapsed > 0 else None
+                    sample[counter] = (value, delta, rate)
+                    rows.append({"time": now,
+                                 "port_dn": port_dn,
+                                 "fabric_port_dn": self.port_dns[port_dn],
+                                 "class_id": class_id,
+                                 "counter": counter,
+                                 "value": value,
+                                 "delta": delta,
+                                 "rate": rate})
+
+                if key not in self._ring:
+                    self._ring[key] = collections.deque(maxlen=self.history)
+                self._ring[key].append((now, sample))
+
+        log.debug("Sampled %d counters of %d ports", len(rows),
+                  len(self.port_dns))
+        return rows
+
+    def samples(self, port_dn, class_id):
+        """
+        Returns the buffered samples of a port
+
+        Args:
+            port_dn (string): physical port dn
+            class_id (string): stats class
+
+        Returns:
+            list of (time, {counter: (value, delta, rate)}), oldest first
+        """
+
+        return list(self._ring.get((port_dn, class_id), []))
+
+    def run(self, interval=60, count=None, sink=None):
+        """
+        Samples the ports every 'interval' seconds and streams the rows
+
+        Args:
+            interval (int): seconds between samples
+            count (int): number of samples, None to sample forever
+            sink (callable): called with the rows of every sample,
+                             refer csv_sink and jsonl_sink
+
+        Returns:
+            None
+        """
+
+        done = 0
+        while count is None or done < count:
+            start = time.time()
+            rows = self.sample()
+            if sink is not None:
+                sink(rows)
+            done += 1
+            if count is not None and done >= count:
+                break
+            time.sleep(max(0, interval - (time.time() - start)))
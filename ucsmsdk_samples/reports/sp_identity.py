@@ -0,0 +1,206 @@
+# Copyright 2015 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains an index of the MAC and WWPN addresses of every
+service profile of a ucs domain.
+"""
+
+import json
+import logging
+import os
+import time
+
+log = logging.getLogger('ucs')
+
+# addresses which are not yet assigned from a pool
+_UNASSIGNED_ADDRS = ["", "derived", "00:00:00:00:00:00",
+                     "20:00:00:00:00:00:00:00"]
+
+
+def sp_identities(handle):
+    """
+    Returns the MAC and WWPN addresses of every service profile, using a
+    single query for LsServer, VnicEther and VnicFc
+
+    Args:
+        handle (UcsHandle)
+
+    Returns:
+        dict: {sp_dn: {"pn_dn": blade dn,
+                       "type": service profile type,
+                       "macs": {vnic name: mac address},
+                       "wwpns": {vhba name: wwpn address}}}
+
+    Example:
+        identities = sp_identities(handle)
+    """
+
+    query_data = handle.query_classids("LsServer", "VnicEther", "VnicFc")
+
+    identities = {}
+    for sp in query_data["LsServer"]:
+        identities[sp.dn] = {"pn_dn": sp.pn_dn,
+                             "type": sp.type,
+                             "macs": {},
+                             "wwpns": {}}
+
+    for class_id, key in [("VnicEther", "macs"), ("VnicFc", "wwpns")]:
+        for vnic in query_data[class_id]:
+            sp_dn = os.path.dirname(vnic.dn)
+            # vnics of connectivity policies are not part of an sp
+            if sp_dn in identities:
+                identities[sp_dn][key][vnic.name] = vnic.addr
+
+    return identities
+
+
+class SpIdentityIndex(object):
+    """
+    Index of service profile MAC and WWPN addresses, with reverse lookup
+    of the service profile and blade using an address.
+
+    Args:
+        identities (dict): refer sp_identities
+
+    Example:
+        index = SpIdentityIndex.build(handle)
+        index.save("/var/tmp/ucs-identities.json")
+
+        index = SpIdentityIndex.load("/var/tmp/ucs-identities.json")
+        index.refresh(handle)
+        sp_dn, vnic_name = index.lookup("00:25:B5:00:00:1F")
+    """
+
+    def __init__(self, identities=None, updated=None):
+        self.identities = {}
+        self.addresses = {}
+        self.updated = updated
+        for sp_dn, identity in (identities or {}).items():
+            self._add(sp_dn, identity)
+
+    @classmethod
+    def build(cls, handle):
+        """
+        Builds the index from the ucs domain
+        """
+
+        return cls(sp_identities(handle), updated=time.time())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads an index saved using save()
+        """
+
+        with open(path) as file_obj:
+            data = json.load(file_obj)
+        return cls(data["identities"], updated=data["updated"])
+
+    def save(self, path):
+        """
+        Saves the index to a json file
+        """
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as file_obj:
+            json.dump({"updated": self.updated,
+                       "identities": self.identities}, file_obj)
+        if hasattr(os, "replace"):
+            os.replace(tmp_path, path)
+        else:
+            # python 2, rename does not replace an existing file on windows
+            if os.name == "nt" and os.path.exists(path):
+                os.remove(path)
+            os.rename(tmp_path, path)
+
+    def _add(self, sp_dn, identity):
+        self.identities[sp_dn] = identity
+        for key in ["macs", "wwpns"]:
+            for name, addr in identity[key].items():
+                if addr and addr not in _UNASSIGNED_ADDRS:
+                    self.addresses[addr.upper()] = (sp_dn, name)
+
+    def _remove(self, sp_dn):
+        identity = self.identities.pop(sp_dn)
+        for key in ["macs", "wwpns"]:
+            for name, addr in identity[key].items():
+                if addr and self.addresses.get(addr.upper()) == (sp_dn, name):
+                    del self.addresses[addr.upper()]
+
+    def refresh(self, handle):
+        """
+        Updates the index with the current state of the ucs domain. Only the
+        service profiles which changed are re-indexed.
+
+        Returns:
+            dict: {"added": [sp_dn], "removed": [sp_dn], "changed": [sp_dn]}
+        """
+
+        identities = sp_identities(handle)
+        delta = {"added": [], "removed": [], "changed": []}
+
+        for sp_dn in list(self.identities):
+            if sp_dn not in identities:
+                self._remove(sp_dn)
+                delta["removed"].append(sp_dn)
+
+        for sp_dn, identity in identities.items():
+            current = self.identities.get(sp_dn)
+            if current == identity:
+                continue
+            if current is None:
+                delta["added"].append(sp_dn)
+            else:
+                self._remove(sp_dn)
+                delta["changed"].append(sp_dn)
+            self._add(sp_dn, identity)
+
+        self.updated = time.time()
+        log.debug("SP identity index refreshed: %d added, %d removed, "
+                  "%d changed", len(delta["added"]), len(delta["removed"]),
+                  len(delta["changed"]))
+        return delta
+
+    def macs(self, sp_dn):
+        """
+        Returns {vnic name: mac address} of a service profile
+        """
+
+        return self.identities[sp_dn]["macs"]
+
+    def wwpns(self, sp_dn):
+        """
+        Returns {vhba name: wwpn address} of a service profile
+        """
+
+        return self.identities[sp_dn]["wwpns"]
+
+    def lookup(self, addr):
+        """
+        Returns (sp_dn, vnic name) using a MAC or WWPN address,
+        None if the address is not assigned
+        """
+
+        return self.addresses.get(addr.upper())
+
+    def blade(self, addr):
+        """
+        Returns the dn of the blade using a MAC or WWPN address,
+        None if the address is not assigned or the sp is not associated
+        """
+
+        entry = self.addresses.get(addr.upper())
+        if entry is None:
+            return None
+        return self.identities[entry[0]]["pn_dn"] or None
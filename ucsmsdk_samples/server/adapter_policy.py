@@ -11,6 +11,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from ucsmsdk_samples.server.org_resolver import org_policy_invalidate
+
 
 def adapter_policy_create(handle, name, descr="", parent_dn="org-root"):
     """
@@ -41,4 +43,5 @@ def adapter_policy_create(handle, name, descr="", parent_dn="org-root"):
     mo = AdaptorHostEthIfProfile(parent_mo_or_dn=obj, name=name, descr=descr)
     handle.add_mo(mo, modify_present=True)
     handle.commit()
+    org_policy_invalidate(handle)
     return mo
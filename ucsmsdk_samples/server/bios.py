@@ -11,6 +11,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from ucsmsdk_samples.server.org_resolver import org_policy_invalidate
+
 
 def bios_create(handle, parent_org_dn, name, descr="",
                 reboot_on_update="no",
@@ -116,6 +118,7 @@ def bios_create(handle, parent_org_dn, name, descr="",
 
     handle.add_mo(mo, modify_present=True)
     handle.commit()
+    org_policy_invalidate(handle)
     return mo
 
 
@@ -143,6 +146,7 @@ def bios_remove(handle, name, parent_org_dn):
     if mo:
         handle.remove_mo(mo)
         handle.commit()
+        org_policy_invalidate(handle)
     else:
         raise ValueError("Bios policy '%s' not found.Nothing to remove" %
                          profile_dn)
@@ -17,6 +17,31 @@ import time
 log = logging.getLogger('ucs')
 
 
+# CIMC address classes: (ip version, access, unassigned address)
+_CIMC_ADDR_CLASSES = {
+    "VnicIpV4PooledAddr": (4, "oob", "0.0.0.0"),
+    "VnicIpV4MgmtPooledAddr": (4, "in-band", "0.0.0.0"),
+    "VnicIpV4ProfDerivedAddr": (4, "oob", "0.0.0.0"),
+    "VnicIpV4StaticAddr": (4, "oob", "0.0.0.0"),
+    "VnicIpV6MgmtPooledAddr": (6, "in-band", "::"),
+    "VnicIpV6StaticAddr": (6, "oob", "::"),
+}
+
+
+def _cimc_address(mo):
+    """
+    Classifies a CIMC address object, None if it is not an assigned address
+    """
+
+    addr_class = _CIMC_ADDR_CLASSES.get(mo.get_class_id())
+    if addr_class is None:
+        return None
+    version, access, unassigned = addr_class
+    if not mo.addr or mo.addr == unassigned:
+        return None
+    return {'addr': mo.addr, 'version': version, 'access': access}
+
+
 def get_cimc_addresses(handle, phys_mo):
     """
     Get cimc ip addresses
@@ -38,41 +63,61 @@ def get_cimc_addresses(handle, phys_mo):
     mos = handle.query_children(in_mo=phys_mo, class_id="MgmtController",
                                 hierarchy=True)
     bmc_addrs = []
+    for mo in mos:
+        addr = _cimc_address(mo)
+        if addr is None:
+            continue
+        log.debug("Server %s. CIMC address: dn=%s, addr=%s, class=%s, "
+                  "access=%s", phys_mo.dn, mo.dn, mo.addr,
+                  mo.get_class_id(), addr['access'])
+        bmc_addrs.append(addr)
+
+    # IP v4 addresses first
+    bmc_addrs.sort(key=lambda addr: addr['version'])
+    return bmc_addrs
+
+
+def get_cimc_addresses_all(handle):
+    """
+    Get cimc ip addresses of every blade and rack server, using a single
+    query for all the CIMC address classes
+
+    Args:
+        handle (UcsHandle)
+
+    Returns:
+        dict: {server dn: [{'addr' : "ip address",
+                            'version' : "version",
+                            'access' : "access"}]}
+
+    Example:
+        addresses = get_cimc_addresses_all(handle)
+        inband = [addr['addr']
+                  for addr in addresses["sys/chassis-1/blade-1"]
+                  if addr['access'] == 'in-band']
+    """
 
-    # IP v4 addresses
-    ipv4_addr_set = [x for x in mos if
-                     x.get_class_id() == 'VnicIpV4PooledAddr' or
-                     x.get_class_id() == 'VnicIpV4MgmtPooledAddr' or
-                     x.get_class_id() == 'VnicIpV4ProfDerivedAddr' or
-                     x.get_class_id() == 'VnicIpV4StaticAddr']
-    for mo in ipv4_addr_set:
-        if mo.get_class_id() == 'VnicIpV4MgmtPooledAddr':
-            access = 'in-band'
-        else:
-            access = 'oob'
-        if mo.addr != '0.0.0.0':
-            addr = {'addr': mo.addr, 'version': 4, 'access': access}
-            log.debug("CIMC IP address: dn=%s, addr=%s, class=%s, access=%s",
-                      mo.dn, mo.addr, mo.get_class_id(), access)
-            bmc_addrs.append(addr)
-
-    # IP v6 addresses
-    ipv6_addr_set = [x for x in mos if
-                     x.get_class_id() == 'VnicIpV6MgmtPooledAddr' or
-                     x.get_class_id() == 'VnicIpV6MgmtPooledAddr' or
-                     x.get_class_id() == 'VnicIpV6StaticAddr']
-    for mo in ipv6_addr_set:
-        if mo.addr != '::':
-            log.debug("CIMC IP address: dn=%s, addr=%s, class=%s",
-                      mo.dn, mo.addr, mo.get_class_id())
-            if mo.get_class_id() == 'VnicIpV6MgmtPooledAddr':
-                access = 'in-band'
-            else:
-                access = 'oob'
-            addr = {'addr': mo.addr, 'version': 6, 'access': access}
-            log.debug("Server %s. CIMC address: %s, access: %s", phys_mo.dn,
-                      mo.addr, access)
-            bmc_addrs.append(addr)
+    query_data = handle.query_classids(
+        ["ComputeBlade", "ComputeRackUnit"] + sorted(_CIMC_ADDR_CLASSES))
+
+    bmc_addrs = {}
+    for class_id in ["ComputeBlade", "ComputeRackUnit"]:
+        for mo in query_data[class_id]:
+            bmc_addrs[mo.dn] = []
+
+    for class_id in sorted(_CIMC_ADDR_CLASSES):
+        for mo in query_data[class_id]:
+            # sys/chassis-1/blade-1/mgmt/ipv4-pooled-addr
+            server_dn = mo.dn.split("/mgmt/")[0]
+            if server_dn not in bmc_addrs:
+                # service profile or adaptor addresses
+                continue
+            addr = _cimc_address(mo)
+            if addr is not None:
+                bmc_addrs[server_dn].append(addr)
+
+    for addrs in bmc_addrs.values():
+        addrs.sort(key=lambda addr: addr['version'])
     return bmc_addrs
 
 
@@ -0,0 +1,166 @@
+# Copyright 2015 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module checks the reachability of many CIMC addresses concurrently,
+using asyncio. Requires python 3.5 or later.
+"""
+
+import asyncio
+import logging
+import time
+
+log = logging.getLogger('ucs')
+
+# upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+
+async def _tcp_probe(host, port, timeout):
+    start = time.time()
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    latency = (time.time() - start) * 1000
+    writer.close()
+    return latency
+
+
+async def _icmp_probe(host, timeout):
+    start = time.time()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "ping", "-c1", "-W", str(max(1, int(timeout))), host,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL)
+    except OSError:
+        return None
+    try:
+        ret = await asyncio.wait_for(process.wait(), timeout + 1)
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        # also runs when the deadline of the host cancels the probe
+        if process.returncode is None:
+            try:
+                process.kill()
+            except OSError:
+                pass
+            await process.wait()
+    if ret != 0:
+        return None
+    return (time.time() - start) * 1000
+
+
+async def _probe_ports(host, ports, timeout, icmp):
+    for port in ports:
+        latency = await _tcp_probe(host, port, timeout)
+        if latency is not None:
+            return latency
+    if icmp:
+        return await _icmp_probe(host, timeout)
+    return None
+
+
+async def _probe(host, ports, timeout, icmp, semaphore):
+    async with semaphore:
+        # timeout is the deadline of the host, every probe included
+        try:
+            return await asyncio.wait_for(
+                _probe_ports(host, ports, timeout, icmp), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def _histogram(latencies, buckets):
+    counts = [0] * (len(buckets) + 1)
+    for latency in latencies:
+        for i, bound in enumerate(buckets):
+            if latency <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    return list(zip(buckets + [None], counts))
+
+
+async def cimc_sweep_async(hosts, ports=(443, 22), timeout=2.0,
+                           concurrency=256, icmp=False,
+                           buckets=LATENCY_BUCKETS):
+    """
+    Coroutine version of cimc_sweep, refer cimc_sweep
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+    hosts = list(hosts)
+    latencies = await asyncio.gather(
+        *[_probe(host, ports, timeout, icmp, semaphore) for host in hosts])
+
+    report = {"up": {}, "down": [], "histogram": None}
+    for host, latency in zip(hosts, latencies):
+        if latency is None:
+            report["down"].append(host)
+        else:
+            report["up"][host] = latency
+    report["histogram"] = _histogram(report["up"].values(), buckets)
+    return report
+
+
+def cimc_sweep(hosts, ports=(443, 22), timeout=2.0, concurrency=256,
+               icmp=False, buckets=LATENCY_BUCKETS):
+    """
+    Checks the reachability of many hosts concurrently. A host is up if a
+    tcp connection to one of the ports succeeds, or optionally if it
+    answers to ping.
+
+    Args:
+        hosts (list of string): addresses to check
+        ports (list of int): tcp ports tried in order
+        timeout (float): seconds allowed for each host, every port and the
+                         ping included
+        concurrency (int): maximum hosts probed at the same time
+        icmp (bool): if True, ping hosts with no open port. Uses the
+                     system ping command.
+        buckets (list of int): upper bounds of the latency histogram
+                               buckets, in milliseconds
+
+    Returns:
+        dict: {"up": {host: latency in ms},
+               "down": [host],
+               "histogram": [(upper bound in ms, count)], the last upper
+                            bound is None}
+
+    Example:
+        from ucsmsdk_samples.server.bmc import get_cimc_addresses_all
+
+        addresses = get_cimc_addresses_all(handle)
+        hosts = [addr['addr'] for addrs in addresses.values()
+                 for addr in addrs if addr['access'] == 'oob']
+        report = cimc_sweep(hosts, ports=[443], timeout=1.5)
+    """
+
+    loop = asyncio.new_event_loop()
+    try:
+        start = time.time()
+        report = loop.run_until_complete(
+            cimc_sweep_async(hosts, ports, timeout, concurrency, icmp,
+                             buckets))
+        log.debug("Swept %d hosts in %.1fs: %d up, %d down",
+                  len(report["up"]) + len(report["down"]),
+                  time.time() - start, len(report["up"]),
+                  len(report["down"]))
+        return report
+    finally:
+        loop.close()
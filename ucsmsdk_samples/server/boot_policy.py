@@ -13,6 +13,9 @@
 
 
 import logging
+
+from ucsmsdk_samples.server.org_resolver import org_policy_invalidate
+
 log = logging.getLogger('ucs')
 
 
@@ -73,6 +76,7 @@ def boot_policy_create(handle, name, descr="",
         _add_device(handle, mo, boot_device)
     handle.add_mo(mo, modify_present=True)
     handle.commit()
+    org_policy_invalidate(handle)
     return mo
 
 
@@ -153,6 +157,7 @@ def boot_policy_remove(handle, name, parent_dn="org-root"):
 
     handle.remove_mo(mo)
     handle.commit()
+    org_policy_invalidate(handle)
 
 
 def boot_policy_exist(handle, name, reboot_on_update="yes",
@@ -293,3 +298,156 @@ def _add_usb_internal(parent_mo, order):
 
 def _add_usb_external(parent_mo, order):
     LsbootUsbExternalImage(parent_mo_or_dn=parent_mo, order=order)
+
+
+def _boot_policy_subtrees(handle):
+    """
+    Fetches every LsbootPolicy with its boot devices in one hierarchical
+    class query
+
+    Returns:
+        (dict, dict): ({policy dn: LsbootPolicy mo},
+                       {dn: [child mo]})
+    """
+
+    import os
+
+    mos = handle.query_classid(class_id="LsbootPolicy", hierarchy=True)
+    policies = {}
+    children = {}
+    for mo in mos:
+        if mo.get_class_id() == "LsbootPolicy":
+            policies[mo.dn] = mo
+        elif mo.get_class_id().startswith("Lsboot"):
+            children.setdefault(os.path.dirname(mo.dn), []).append(mo)
+    return policies, children
+
+
+def _boot_policy_devices(policy_dn, children):
+    """
+    Returns {dn relative to the policy: mo} of the subtree of a policy
+    """
+
+    devices = {}
+    pending = list(children.get(policy_dn, []))
+    while pending:
+        mo = pending.pop()
+        devices[mo.dn[len(policy_dn) + 1:]] = mo
+        pending.extend(children.get(mo.dn, []))
+    return devices
+
+
+def boot_policy_clone(handle, ref_dn, org_dns, name=None, chunk_size=20,
+                      dry_run=False):
+    """
+    This method clones a reference boot policy, including its boot device
+    order, to many orgs. Every boot policy subtree is fetched in one query
+    and only the boot devices whose order or type differ are changed, with
+    one commit per chunk of orgs.
+
+    Args:
+        handle (UcsHandle)
+        ref_dn (string): dn of the reference boot policy
+        org_dns (list of string): orgs to clone the policy to
+        name (string): name of the clones, default is the name of the
+                       reference policy
+        chunk_size (int): orgs per commit
+        dry_run (bool): if True, only computes the changes
+
+    Returns:
+        dict: {policy dn: {"created": bool,
+                           "policy_modified": bool,
+                           "modified": [relative dn],
+                           "added": [relative dn],
+                           "removed": [relative dn]}}
+              only the policies which differ are reported. "modified",
+              "added" and "removed" are the boot devices.
+
+    Raises:
+        ValueError: If LsbootPolicy or OrgOrg is not present
+
+    Example:
+        report = boot_policy_clone(handle, "org-root/boot-policy-pxe",
+                                   ["org-root/org-t%d" % i
+                                    for i in range(200)])
+    """
+
+    import os
+
+    from ucsmsdk_samples.bulk import chunks, commit_in_chunks, \
+        mo_config_props, mo_copy
+
+    policies, children = _boot_policy_subtrees(handle)
+    ref = policies.get(ref_dn)
+    if ref is None:
+        raise ValueError("boot policy '%s' does not exist" % ref_dn)
+    name = name or ref.name
+
+    org_dns = list(org_dns)
+    orgs = set(mo.dn for mo in handle.query_classid("OrgOrg"))
+    for org_dn in org_dns:
+        if org_dn not in orgs:
+            raise ValueError("org '%s' is not available" % org_dn)
+
+    ref_props = mo_config_props(ref, naming=False)
+    ref_devices = _boot_policy_devices(ref_dn, children)
+
+    report = {}
+    for org_chunk in chunks(org_dns, chunk_size):
+        staged = []
+        for org_dn in org_chunk:
+            dn = org_dn + "/boot-policy-" + name
+            if dn == ref_dn:
+                continue
+
+            policy = policies.get(dn)
+            if policy is None:
+                report[dn] = {"created": True, "policy_modified": False,
+                              "modified": [], "added": [], "removed": []}
+                staged.append(("add", mo_copy(ref, org_dn, children,
+                                              {"name": name})))
+                continue
+
+            changes = {"created": False, "policy_modified": False,
+                       "modified": [], "added": [], "removed": []}
+            if mo_config_props(policy, naming=False) != ref_props:
+                changes["policy_modified"] = True
+                staged.append(("add", mo_copy(ref, org_dn, {},
+                                              {"name": name})))
+
+            # sorted, so that a device comes before its subtree
+            devices = _boot_policy_devices(dn, children)
+            for rel_dn in sorted(devices):
+                if rel_dn in ref_devices or \
+                        any(rel_dn.startswith(removed + "/")
+                            for removed in changes["removed"]):
+                    continue
+                changes["removed"].append(rel_dn)
+                staged.append(("remove", devices[rel_dn]))
+
+            for rel_dn in sorted(ref_devices):
+                parent_dn = os.path.dirname(dn + "/" + rel_dn)
+                device = devices.get(rel_dn)
+                if device is None:
+                    if any(rel_dn.startswith(added + "/")
+                           for added in changes["added"]):
+                        continue
+                    changes["added"].append(rel_dn)
+                    staged.append(("add", mo_copy(ref_devices[rel_dn],
+                                                  parent_dn, children)))
+                elif mo_config_props(device) != \
+                        mo_config_props(ref_devices[rel_dn]):
+                    changes["modified"].append(rel_dn)
+                    staged.append(("add", mo_copy(ref_devices[rel_dn],
+                                                  parent_dn, {})))
+
+            if changes["policy_modified"] or changes["modified"] or \
+                    changes["added"] or changes["removed"]:
+                report[dn] = changes
+
+        if staged and not dry_run:
+            commit_in_chunks(handle, staged, len(staged))
+
+    if report and not dry_run:
+        org_policy_invalidate(handle)
+    return report
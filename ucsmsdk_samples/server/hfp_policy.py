@@ -11,6 +11,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from ucsmsdk_samples.server.org_resolver import org_policy_invalidate
+
 
 def hfp_create(handle, name, blade_bundle_version, rack_bundle_version,
                mode="staged", descr="", parent_dn="org-root"):
@@ -53,6 +55,7 @@ def hfp_create(handle, name, blade_bundle_version, rack_bundle_version,
                                  )
     handle.add_mo(mo, modify_present=True)
     handle.commit()
+    org_policy_invalidate(handle)
     return mo
 
 
@@ -128,6 +131,7 @@ def hfp_remove(handle, name, parent_dn="org-root"):
 
     handle.remove_mo(mo)
     handle.commit()
+    org_policy_invalidate(handle)
 
 
 def hfp_exists(handle, name, blade_bundle_version, rack_bundle_version,
@@ -11,6 +11,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from ucsmsdk_samples.server.org_resolver import org_policy_invalidate
+
 
 def local_disk_policy_create(handle, name, mode="any-configuration",
                              flex_flash_state="enable",
@@ -58,6 +60,7 @@ def local_disk_policy_create(handle, name, mode="any-configuration",
         mode=mode)
     handle.add_mo(mo, modify_present=True)
     handle.commit()
+    org_policy_invalidate(handle)
     return mo
 
 
@@ -137,6 +140,7 @@ def local_disk_policy_remove(handle, name, parent_dn="org-root"):
 
     handle.remove_mo(mo)
     handle.commit()
+    org_policy_invalidate(handle)
 
 
 def local_disk_policy_exist(handle, name, mode="any-configuration",
@@ -11,6 +11,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from ucsmsdk_samples.server.org_resolver import org_policy_invalidate
+
 
 def maintenance_policy_create(handle, name,
                               uptime_disr="user-ack",
@@ -49,6 +51,7 @@ def maintenance_policy_create(handle, name,
                             uptime_disr=uptime_disr, descr=descr)
     handle.add_mo(mo, modify_present=True)
     handle.commit()
+    org_policy_invalidate(handle)
     return mo
 
 
@@ -120,6 +123,7 @@ def maintenance_policy_remove(handle, name, parent_dn="org-root"):
 
     handle.remove_mo(mo)
     handle.commit()
+    org_policy_invalidate(handle)
 
 
 def maintenance_policy_exist(handle, name, uptime_disr="user-ack", descr="",
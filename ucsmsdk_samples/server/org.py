@@ -11,6 +11,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
+
+from ucsmsdk_samples.server.org_resolver import org_policy_invalidate
+
+log = logging.getLogger('ucs')
+
 
 def org_create(handle, name, descr="", parent_dn="org-root"):
 
@@ -42,6 +48,7 @@ def org_create(handle, name, descr="", parent_dn="org-root"):
     mo = OrgOrg(parent_mo_or_dn=parent_dn, name=name, descr=descr)
     handle.add_mo(mo, modify_present=True)
     handle.commit()
+    org_policy_invalidate(handle)
     return mo
 
 
@@ -101,6 +108,7 @@ def org_remove_by_dn(handle, org_dn):
         raise ValueError("org '%s' does not exist" % org_dn)
     handle.remove_mo(mo)
     handle.commit()
+    org_policy_invalidate(handle)
 
 
 def org_remove(handle, name, parent_dn="org-root"):
@@ -150,3 +158,142 @@ def org_exists(handle, name, descr="", parent_dn="org-root"):
             return False
         return True
     return False
+
+
+def _org_tree_dns(tree, parent_dn="org-root"):
+    """
+    Returns the dns of every org of a tree, parents before children
+    """
+
+    dns = []
+    if isinstance(tree, dict):
+        for name, subtree in sorted(tree.items()):
+            dn = parent_dn + "/org-" + name
+            dns.append(dn)
+            dns.extend(_org_tree_dns(subtree or {}, dn))
+        return dns
+
+    for path in tree:
+        if not isinstance(path, (list, tuple)):
+            path = path.strip("/").split("/")
+        dn = parent_dn
+        for name in path:
+            dn = dn + "/org-" + name
+            if dn not in dns:
+                dns.append(dn)
+    return dns
+
+
+def _org_depth(org_dn):
+    return org_dn.count("/")
+
+
+def org_tree_create(handle, tree, parent_dn="org-root", dry_run=False):
+    """
+    This method creates a tree of sub organizations. The existing orgs are
+    loaded in a single query and the missing orgs are created with one
+    commit per depth level.
+
+    Args:
+        handle (UcsHandle)
+        tree (dict or list): nested dicts {name: {child name: ...}} or
+                             paths ["t1/dev", "t1/prod", ["t2", "dev"]]
+        parent_dn (string): org dn under which the tree is created
+        dry_run (bool): if True, only returns the orgs to create
+
+    Returns:
+        dict: {"created": [dn], "existing": [dn], "commits": int}
+
+    Raises:
+        ValueError: If OrgOrg is not present
+
+    Example:
+        org_tree_create(handle, {"t1": {"dev": None, "prod": None},
+                                 "t2": {"dev": {"web": None}}})
+        org_tree_create(handle, ["t1/dev", "t1/prod", "t2/dev/web"])
+    """
+
+    from ucsmsdk.mometa.org.OrgOrg import OrgOrg
+
+    orgs = set(mo.dn for mo in handle.query_classid("OrgOrg"))
+    if parent_dn not in orgs:
+        raise ValueError("org '%s' does not exist" % parent_dn)
+
+    report = {"created": [], "existing": [], "commits": 0}
+    levels = {}
+    for dn in _org_tree_dns(tree, parent_dn):
+        if dn in orgs:
+            report["existing"].append(dn)
+        else:
+            report["created"].append(dn)
+            levels.setdefault(_org_depth(dn), []).append(dn)
+
+    log.debug("Org tree: %d to create in %d levels, %d existing",
+              len(report["created"]), len(levels), len(report["existing"]))
+    if dry_run:
+        return report
+
+    for depth in sorted(levels):
+        for dn in levels[depth]:
+            parent, rn = dn.rsplit("/", 1)
+            handle.add_mo(OrgOrg(parent_mo_or_dn=parent, name=rn[4:]),
+                          modify_present=True)
+        handle.commit()
+        report["commits"] += 1
+
+    if report["created"]:
+        org_policy_invalidate(handle)
+    return report
+
+
+def org_tree_remove(handle, tree, parent_dn="org-root", dry_run=False):
+    """
+    This method removes a tree of sub organizations, including the sub
+    organizations which are not in the tree. The orgs are removed deepest
+    first, with one commit per depth level.
+
+    Args:
+        handle (UcsHandle)
+        tree (dict or list): refer org_tree_create
+        parent_dn (string): org dn under which the tree resides
+        dry_run (bool): if True, only returns the orgs to remove
+
+    Returns:
+        dict: {"removed": [dn] in the order of removal,
+               "missing": [dn], "commits": int}
+
+    Example:
+        report = org_tree_remove(handle, ["sandbox-42"], dry_run=True)
+    """
+
+    orgs = dict((mo.dn, mo) for mo in handle.query_classid("OrgOrg"))
+
+    report = {"removed": [], "missing": [], "commits": 0}
+    targets = set()
+    for dn in _org_tree_dns(tree, parent_dn):
+        if dn not in orgs:
+            report["missing"].append(dn)
+            continue
+        targets.update(org_dn for org_dn in orgs
+                       if org_dn == dn or org_dn.startswith(dn + "/"))
+
+    levels = {}
+    for dn in targets:
+        levels.setdefault(_org_depth(dn), []).append(dn)
+    for depth in sorted(levels, reverse=True):
+        report["removed"].extend(sorted(levels[depth]))
+
+    log.debug("Org tree: %d to remove in %d levels, %d missing",
+              len(report["removed"]), len(levels), len(report["missing"]))
+    if dry_run:
+        return report
+
+    for depth in sorted(levels, reverse=True):
+        for dn in sorted(levels[depth]):
+            handle.remove_mo(orgs[dn])
+        handle.commit()
+        report["commits"] += 1
+
+    if report["removed"]:
+        org_policy_invalidate(handle)
+    return report
@@ -0,0 +1,182 @@
+# Copyright 2015 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module resolves policies by name the way UCSM does, looking up the
+nearest org from the given org upto org-root, using an in-memory copy of
+the org tree and the policies.
+"""
+
+import logging
+import os
+import weakref
+
+log = logging.getLogger('ucs')
+
+POLICY_CLASS_IDS = [
+    "LsServer",
+    "LsbootPolicy",
+    "BiosVProfile",
+    "LsmaintMaintPolicy",
+    "FirmwareComputeHostPack",
+    "StorageLocalDiskConfigPolicy",
+    "ComputeScrubPolicy",
+    "SolPolicy",
+    "PowerPolicy",
+    "AdaptorHostEthIfProfile",
+    "CimcvmediaMountConfigPolicy",
+]
+
+_RESOLVERS = weakref.WeakKeyDictionary()
+
+
+class OrgPolicyResolver(object):
+    """
+    Answers "which policy named X applies in org Y" from memory. The org
+    tree and each policy class are loaded with a single query on first use,
+    and again after invalidate(). The resolver only keeps a weak reference
+    to the handle.
+
+    Args:
+        handle (UcsHandle)
+        class_ids (list of string): policy classes, default POLICY_CLASS_IDS.
+                                    For LsServer only templates are loaded.
+
+    Example:
+        resolver = OrgPolicyResolver(handle)
+        dn = resolver.resolve("LsbootPolicy", "pxe",
+                              "org-root/org-t1/org-dev")
+    """
+
+    def __init__(self, handle, class_ids=None):
+        self._handle = weakref.ref(handle)
+        self.class_ids = class_ids or POLICY_CLASS_IDS
+        self._orgs = None
+        self._policies = {}
+
+    @property
+    def handle(self):
+        handle = self._handle()
+        if handle is None:
+            raise ValueError("The handle of the resolver no longer exists")
+        return handle
+
+    def _templates_query(self):
+        return self.handle.query_classid(
+            class_id="LsServer", filter_str='(type, instance, type="ne")')
+
+    def _policies_set(self, class_id, mos):
+        policies = {}
+        for mo in mos:
+            policies[(os.path.dirname(mo.dn), mo.name)] = mo.dn
+        self._policies[class_id] = policies
+        log.debug("Loaded %d %s", len(policies), class_id)
+
+    def load(self):
+        """
+        Loads the org tree and every policy class
+        """
+
+        class_ids = [class_id for class_id in self.class_ids
+                     if class_id != "LsServer"]
+        query_data = self.handle.query_classids(["OrgOrg"] + class_ids)
+        self._orgs = set(mo.dn for mo in query_data["OrgOrg"])
+        for class_id in class_ids:
+            self._policies_set(class_id, query_data[class_id])
+        if "LsServer" in self.class_ids:
+            self._policies_set("LsServer", self._templates_query())
+
+    def invalidate(self):
+        """
+        Drops the in-memory copy, it is reloaded on next use
+        """
+
+        self._orgs = None
+        self._policies = {}
+
+    def org_exists(self, org_dn):
+        """
+        Returns True if the org exists
+        """
+
+        if self._orgs is None:
+            self._orgs = set(mo.dn for mo in
+                             self.handle.query_classid("OrgOrg"))
+        return org_dn in self._orgs
+
+    def resolve(self, class_id, name, org_dn="org-root"):
+        """
+        Returns the dn of the policy named 'name' which applies in the org,
+        None if no such policy exists upto org-root
+        """
+
+        if class_id not in self.class_ids:
+            raise ValueError("Policy class '%s' is not loaded" % class_id)
+
+        if class_id not in self._policies:
+            if class_id == "LsServer":
+                mos = self._templates_query()
+            else:
+                mos = self.handle.query_classid(class_id)
+            self._policies_set(class_id, mos)
+
+        policies = self._policies[class_id]
+        while org_dn:
+            dn = policies.get((org_dn, name))
+            if dn is not None:
+                return dn
+            if org_dn == "org-root":
+                break
+            org_dn = os.path.dirname(org_dn)
+        return None
+
+
+def org_policy_resolver(handle):
+    """
+    Returns the resolver shared by the sample methods for the handle
+
+    Args:
+        handle (UcsHandle)
+
+    Returns:
+        OrgPolicyResolver
+
+    Example:
+        resolver = org_policy_resolver(handle)
+    """
+
+    resolver = _RESOLVERS.get(handle)
+    if resolver is None:
+        resolver = OrgPolicyResolver(handle)
+        _RESOLVERS[handle] = resolver
+    return resolver
+
+
+def org_policy_invalidate(handle):
+    """
+    Invalidates the resolver shared for the handle. Called by the sample
+    methods which create or remove orgs and policies.
+
+    Args:
+        handle (UcsHandle)
+
+    Returns:
+        None
+
+    Example:
+        org_policy_invalidate(handle)
+    """
+
+    resolver = _RESOLVERS.get(handle)
+    if resolver is not None:
+        resolver.invalidate()
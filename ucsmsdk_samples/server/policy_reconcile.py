@@ -0,0 +1,182 @@
+# Copyright 2015 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module reconciles the server policies of every org against a desired
+state document, using a schema per policy class.
+"""
+
+import logging
+
+log = logging.getLogger('ucs')
+
+# {class_id: (rn prefix, [props managed by the reconcile],
+#              [names of the built-in policies, never removed])}
+# policies named "default" are built-in for every class
+POLICY_SCHEMAS = {
+    "StorageLocalDiskConfigPolicy": (
+        "local-disk-config-",
+        ["mode", "flex_flash_state", "flex_flash_raid_reporting_state",
+         "protect_config", "descr"],
+        []),
+    "ComputeScrubPolicy": (
+        "scrub-",
+        ["flex_flash_scrub", "bios_settings_scrub", "disk_scrub", "descr"],
+        []),
+    "LsmaintMaintPolicy": (
+        "maint-",
+        ["uptime_disr", "sched_name", "descr"],
+        []),
+    "SolPolicy": (
+        "sol-",
+        ["admin_state", "speed", "descr"],
+        []),
+    "PowerPolicy": (
+        "power-policy-",
+        ["prio", "descr"],
+        []),
+    "AdaptorHostEthIfProfile": (
+        "eth-profile-",
+        ["descr"],
+        ["Linux", "Linux-NVMe-RoCE", "MQ", "MQ-SMBd", "SMBClient",
+         "SMBServer", "Solaris", "SRIOV", "SRIOV-HPN", "SRIOV-RSSV2",
+         "SRIOV-VMFEX", "usNIC", "usNICOracle", "VMWare", "VMWarePassThru",
+         "Win-HPN", "Win-HPN-SMBd", "Windows", "WIN-AzureStack"]),
+}
+
+
+def _policy_desired(desired, schemas):
+    """
+    Flattens the desired state document to {dn: (class_id, org_dn, name,
+    props)} and validates it against the schemas
+    """
+
+    policies = {}
+    for org_dn, classes in desired.items():
+        for class_id, named_props in classes.items():
+            if class_id not in schemas:
+                raise ValueError("No schema for policy class '%s'" %
+                                 class_id)
+            prefix, schema_props = schemas[class_id][:2]
+            for name, props in named_props.items():
+                for prop in props:
+                    if prop not in schema_props:
+                        raise ValueError("'%s' is not a property of %s" %
+                                         (prop, class_id))
+                dn = "%s/%s%s" % (org_dn, prefix, name)
+                policies[dn] = (class_id, org_dn, name, props)
+    return policies
+
+
+def policy_reconcile(handle, desired, prune=False, chunk_size=50,
+                     dry_run=False, schemas=None):
+    """
+    Creates, modifies and optionally removes server policies so that the
+    orgs match the desired state. Every instance of the policy classes is
+    loaded in a single query and only the policies which differ are pushed,
+    in chunked commits.
+
+    Args:
+        handle (UcsHandle)
+        desired (dict): {org_dn: {class_id: {name: {prop: value}}}}
+        prune (bool): if True, policies of the classes listed for an org
+                      which are not in the desired state are removed.
+                      Built-in policies, refer POLICY_SCHEMAS, and
+                      policies not owned locally are never removed.
+        chunk_size (int): maximum changes per commit
+        dry_run (bool): if True, only computes the diff
+        schemas (dict): {class_id: (rn prefix, [props], [built-in names])},
+                        default POLICY_SCHEMAS
+
+    Returns:
+        dict: {"created": [dn], "modified": {dn: {prop: (current, desired)}},
+               "removed": [dn], "unchanged": [dn], "commits": int}
+
+    Raises:
+        ValueError: If OrgOrg is not present, or the desired state uses a
+                    class or property which is not in the schemas
+
+    Example:
+        report = policy_reconcile(
+            handle,
+            {"org-root/org-t1": {
+                "SolPolicy": {"sol-115k": {"admin_state": "enable",
+                                           "speed": "115200"}},
+                "LsmaintMaintPolicy": {"user-ack": {
+                    "uptime_disr": "user-ack"}}}},
+            prune=True)
+    """
+
+    from ucsmsdk.ucscoreutils import load_class
+    from ucsmsdk_samples.bulk import mo_diff, commit_in_chunks
+    from ucsmsdk_samples.server.org_resolver import org_policy_invalidate
+
+    schemas = schemas or POLICY_SCHEMAS
+    policies = _policy_desired(desired, schemas)
+    class_ids = sorted(set(class_id for classes in desired.values()
+                           for class_id in classes))
+
+    query_data = handle.query_classids(["OrgOrg"] + class_ids)
+    orgs = set(mo.dn for mo in query_data["OrgOrg"])
+    for org_dn in desired:
+        if org_dn not in orgs:
+            raise ValueError("org '%s' is not available" % org_dn)
+
+    report = {"created": [], "modified": {}, "removed": [], "unchanged": [],
+              "commits": 0}
+    changes = []
+    removes = []
+
+    existing = {}
+    for class_id in class_ids:
+        protected = ["default"] + schemas[class_id][2]
+        for mo in query_data[class_id]:
+            existing[mo.dn] = mo
+            if not prune or mo.dn in policies or mo.name in protected:
+                continue
+            if mo.policy_owner not in ["local", None]:
+                # owned by ucs central, removed from there
+                continue
+            if class_id in desired.get(mo.dn.rsplit("/", 1)[0], {}):
+                removes.append(("remove", mo))
+                report["removed"].append(mo.dn)
+
+    for dn, (class_id, org_dn, name, props) in sorted(policies.items()):
+        mo = existing.get(dn)
+        if mo is None:
+            mo = load_class(class_id)(
+                parent_mo_or_dn=org_dn, name=name,
+                **dict((prop, str(value)) for prop, value in props.items()
+                       if value is not None))
+            changes.append(("add", mo))
+            report["created"].append(dn)
+            continue
+
+        diff = mo_diff(mo, props)
+        if not diff:
+            report["unchanged"].append(dn)
+            continue
+        for prop, (current, value) in diff.items():
+            setattr(mo, prop, value)
+        changes.append(("set", mo))
+        report["modified"][dn] = diff
+
+    log.debug("Policy reconcile: %d created, %d modified, %d removed, "
+              "%d unchanged", len(report["created"]), len(report["modified"]),
+              len(report["removed"]), len(report["unchanged"]))
+    if not dry_run:
+        report["commits"] = commit_in_chunks(handle, changes + removes,
+                                             chunk_size)
+        if report["created"] or report["removed"]:
+            org_policy_invalidate(handle)
+    return report
@@ -11,6 +11,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from ucsmsdk_samples.server.org_resolver import org_policy_invalidate
+
 
 def power_control_policy_create(handle, name, prio="no-cap", descr="",
                                 parent_dn="org-root"):
@@ -45,6 +47,7 @@ def power_control_policy_create(handle, name, prio="no-cap", descr="",
                      descr=descr)
     handle.add_mo(mo, modify_present=True)
     handle.commit()
+    org_policy_invalidate(handle)
     return mo
 
 
@@ -114,6 +117,7 @@ def power_control_policy_remove(handle, name, parent_dn="org-root"):
 
     handle.remove_mo(mo)
     handle.commit()
+    org_policy_invalidate(handle)
 
 
 def power_control_policy_exist(handle, name, prio="no-cap", descr="",
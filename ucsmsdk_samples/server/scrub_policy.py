@@ -11,6 +11,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from ucsmsdk_samples.server.org_resolver import org_policy_invalidate
+
 
 def scrub_policy_create(handle, name, flex_flash_scrub="no",
                         bios_settings_scrub="no", disk_scrub="no", descr="",
@@ -54,6 +56,7 @@ def scrub_policy_create(handle, name, flex_flash_scrub="no",
                             disk_scrub=disk_scrub)
     handle.add_mo(mo, modify_present=True)
     handle.commit()
+    org_policy_invalidate(handle)
     return mo
 
 
@@ -131,6 +134,7 @@ def scrub_policy_remove(handle, name, parent_dn="org-root"):
 
     handle.remove_mo(mo)
     handle.commit()
+    org_policy_invalidate(handle)
 
 
 def scrub_policy_exist(handle, name, flex_flash_scrub="no",
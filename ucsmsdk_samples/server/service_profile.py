@@ -11,6 +11,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
+
+from ucsmsdk_samples.server.org_resolver import org_policy_invalidate
+
+log = logging.getLogger('ucs')
 
 
 def sp_template_create(handle, name, type, resolve_remote, descr="",
@@ -120,6 +125,7 @@ def sp_template_create(handle, name, type, resolve_remote, descr="",
 
     handle.add_mo(mo, True)
     handle.commit()
+    org_policy_invalidate(handle)
     return mo
 
 
@@ -390,21 +396,10 @@ def sp_create_from_template(handle,
 
     """
 
-    import os 
-
     from ucsmsdk.ucsmethodfactory import ls_instantiate_n_named_template
     from ucsmsdk.ucsbasetype import DnSet, Dn
 
-    mo = None
-    org_dn = parent_dn
-    while mo is None:
-        sp_template_dn = org_dn + "/ls-" + sp_template_name
-        mo = handle.query_dn(sp_template_dn)
-        if mo:
-            break
-        elif not mo and org_dn == 'org-root':
-            raise ValueError("SP template does not exist.")
-        org_dn = os.path.dirname(org_dn)
+    sp_template_dn = _sp_template_resolve(handle, sp_template_name, parent_dn)
 
     dn_set = DnSet()
     for num in range(int(name_suffix_starting_number),
@@ -455,6 +450,7 @@ def sp_delete(handle, sp_name, parent_dn="org-root"):
 
     handle.remove_mo(mo)
     handle.commit()
+    org_policy_invalidate(handle)
 
 
 def sp_power_on(handle, sp_name, parent_dn="org-root"):
@@ -592,3 +588,308 @@ def sp_macaddress(handle, sp_name, parent_dn="org-root"):
         mac_dict[item.name] = item.addr
 
     return mac_dict
+
+
+def _sp_template_resolve(handle, sp_template_name, org_dn):
+    """
+    Resolves the template which applies in the org, walking up the org
+    hierarchy upto org-root
+    """
+
+    from ucsmsdk_samples.server.org_resolver import org_policy_resolver
+
+    resolver = org_policy_resolver(handle)
+    sp_template_dn = resolver.resolve("LsServer", sp_template_name, org_dn)
+    if sp_template_dn is None:
+        # the template may have been created outside of this session
+        resolver.invalidate()
+        sp_template_dn = resolver.resolve("LsServer", sp_template_name,
+                                          org_dn)
+    if sp_template_dn is None:
+        raise ValueError("SP template does not exist.")
+    return sp_template_dn
+
+
+def sp_create_from_template_bulk(handles, sp_template_name, names_by_org,
+                                 chunk_size=50,
+                                 in_error_on_existing="true"):
+    """
+    This method instantiates a large number of Service profiles from a
+    template. The names are split in chunks of 'chunk_size', chunks of an
+    org are instantiated one after the other and different orgs are
+    instantiated concurrently, one session per worker.
+
+    Args:
+        handles (list of UcsHandle): logged in sessions to the same ucs
+                                     domain, one worker per session
+        sp_template_name (string): SP template name.
+        names_by_org (dict): {org_dn: [service profile names]}
+        chunk_size (int): maximum service profiles per request
+        in_error_on_existing (string): "true" or "false"
+
+    Returns:
+        list of dict: one entry per chunk
+            {"org_dn", "sp_template_dn", "names", "created",
+             "latency" (seconds), "error" (None on success)}
+
+    Raises:
+        ValueError: If SP template is not present for an org
+
+    Example:
+        handles = [UcsHandle(ip, user, password) for i in range(4)]
+        for h in handles:
+            h.login()
+        names = {"org-root/org-t1": ["t1-sp%d" % i for i in range(500)],
+                 "org-root/org-t2": ["t2-sp%d" % i for i in range(500)]}
+        report = sp_create_from_template_bulk(handles, "sample_temp", names,
+                                              chunk_size=100)
+    """
+
+    import threading
+    import time
+
+    try:
+        import queue
+    except ImportError:
+        import Queue as queue
+
+    from ucsmsdk.ucsmethodfactory import ls_instantiate_n_named_template
+    from ucsmsdk.ucsbasetype import DnSet, Dn
+    from ucsmsdk_samples.bulk import chunks
+
+    if not handles:
+        raise ValueError("Provide at least one handle")
+
+    # templates are resolved once for every org
+    sp_template_dn_by_org = {}
+    for org_dn in names_by_org:
+        sp_template_dn_by_org[org_dn] = _sp_template_resolve(
+            handles[0], sp_template_name, org_dn)
+
+    jobs = queue.Queue()
+    for org_dn in sorted(names_by_org):
+        jobs.put(org_dn)
+
+    report = []
+    report_lock = threading.Lock()
+
+    def worker(handle):
+        while True:
+            try:
+                org_dn = jobs.get_nowait()
+            except queue.Empty:
+                return
+
+            sp_template_dn = sp_template_dn_by_org[org_dn]
+            for names in chunks(names_by_org[org_dn], chunk_size):
+                dn_set = DnSet()
+                for sp_name in names:
+                    dn = Dn()
+                    dn.attr_set("value", sp_name)
+                    dn_set.child_add(dn)
+
+                entry = {"org_dn": org_dn,
+                         "sp_template_dn": sp_template_dn,
+                         "names": names,
+                         "created": 0,
+                         "error": None}
+                start = time.time()
+                try:
+                    elem = ls_instantiate_n_named_template(
+                        cookie=handle.cookie,
+                        dn=sp_template_dn,
+                        in_error_on_existing=in_error_on_existing,
+                        in_name_set=dn_set,
+                        in_target_org=org_dn)
+                    mos = handle.process_xml_elem(elem)
+                    entry["created"] = len(mos)
+                except Exception as e:
+                    log.debug("Instantiation of %d service profiles in "
+                              "'%s' failed: %s", len(names), org_dn, e)
+                    entry["error"] = str(e)
+                entry["latency"] = time.time() - start
+
+                with report_lock:
+                    report.append(entry)
+
+    threads = [threading.Thread(target=worker, args=(handle,))
+               for handle in handles]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return report
+
+
+# oper_power the server is expected to reach for a LsPower state. The
+# oper_power of the other states (cycle, reset) is reported but not awaited.
+_SP_POWER_TARGET = {
+    "up": "on",
+    "down": "off",
+    "soft-shut-down": "off",
+    "soft-shut-down-only": "off",
+}
+
+
+def sp_power_bulk(handle, sp_dns, state="up", wave_size=20, wave_delay=10,
+                  timeout=600, poll_interval=10):
+    """
+    This function changes the power state of many service profiles. The
+    LsPower changes are committed in waves of 'wave_size' service profiles,
+    'wave_delay' seconds apart, to avoid an inrush spike. The oper_power of
+    the associated servers is then tracked with one class query per poll.
+
+    Args:
+        handle (UcsHandle)
+        sp_dns (list of string): dns of the service profiles
+        state (string): ["up", "down", "soft-shut-down", "cycle-immediate",
+                         "hard-reset-immediate", ...] refer LsPowerConsts
+        wave_size (int): service profiles per commit
+        wave_delay (int): seconds between two waves
+        timeout (int): seconds to wait for the servers to reach the
+                       expected oper_power, 0 to not wait
+        poll_interval (int): seconds between two polls
+
+    Returns:
+        dict: {"waves": int,
+               "oper_power": {sp_dn: oper_power},
+               "reached": {sp_dn: seconds after its wave was committed},
+               "pending": [sp_dn which did not reach the expected state],
+               "unassociated": [sp_dn without a server, not tracked]}
+
+    Raises:
+        ValueError: If LsServer is not present
+
+    Example:
+        report = sp_power_bulk(handle,
+                               ["org-root/ls-sp%d" % i for i in range(200)],
+                               state="down", wave_size=25, wave_delay=30)
+    """
+
+    import time
+
+    from ucsmsdk.mometa.ls.LsPower import LsPower
+    from ucsmsdk_samples.bulk import chunks
+
+    sps = handle.query_dns(*sp_dns)
+    for sp_dn in sp_dns:
+        if sps.get(sp_dn) is None:
+            raise ValueError("sp '%s' does not exist" % sp_dn)
+
+    committed_at = {}
+    waves = 0
+    for wave in chunks(sp_dns, wave_size):
+        if waves:
+            time.sleep(wave_delay)
+        for sp_dn in wave:
+            handle.add_mo(LsPower(parent_mo_or_dn=sp_dn, state=state),
+                          modify_present=True)
+        handle.commit()
+        waves += 1
+        now = time.time()
+        for sp_dn in wave:
+            committed_at[sp_dn] = now
+        log.debug("Power wave %d: %d service profiles set to '%s'", waves,
+                  len(wave), state)
+
+    # the server of a service profile is its pn_dn
+    server_to_sp = dict((sps[sp_dn].pn_dn, sp_dn) for sp_dn in sp_dns
+                        if sps[sp_dn].pn_dn)
+    target = _SP_POWER_TARGET.get(state)
+    report = {"waves": waves, "oper_power": {}, "reached": {},
+              "pending": list(server_to_sp.values()),
+              "unassociated": [sp_dn for sp_dn in sp_dns
+                               if not sps[sp_dn].pn_dn]}
+
+    start = time.time()
+    while True:
+        query_data = handle.query_classids("ComputeBlade", "ComputeRackUnit")
+        now = time.time()
+        for class_id in ["ComputeBlade", "ComputeRackUnit"]:
+            for server in query_data[class_id]:
+                sp_dn = server_to_sp.get(server.dn)
+                if sp_dn is None:
+                    continue
+                report["oper_power"][sp_dn] = server.oper_power
+                if server.oper_power == target and \
+                        sp_dn not in report["reached"]:
+                    report["reached"][sp_dn] = now - committed_at[sp_dn]
+
+        report["pending"] = [sp_dn for sp_dn in report["pending"]
+                             if sp_dn not in report["reached"]]
+        if target is None or not report["pending"] or \
+                now - start >= timeout:
+            break
+        time.sleep(poll_interval)
+
+    return report
+
+
+def sp_vcon_placement_apply(handle, placement, chunk_size=50,
+                            dry_run=False):
+    """
+    This method places the vnics of many service profiles or templates on
+    vcons. The current LsVConAssign objects are read with a single class
+    query and only the assignments which differ are committed, in chunks.
+
+    Args:
+        handle (UcsHandle)
+        placement (dict): {sp_dn: {vnic_name: placement}}
+            placement is a dict {"admin_vcon": ["1", "2", "3", "4", "any"],
+                                 "order": ["unspecified"], ["0-256"],
+                                 "transport": "ethernet" (default), "fc"}
+            or None to deassign the vnic
+        chunk_size (int): maximum assignments per commit
+        dry_run (bool): if True, only computes the delta
+
+    Returns:
+        dict: {"changed": {sp_dn: {vnic_name: {prop: (current, desired)}}},
+               "unchanged": int, "commits": int}
+
+    Example:
+        placement = {
+            "org-root/ls-sp1": {"eth0": {"admin_vcon": "1", "order": "1"},
+                                "eth1": {"admin_vcon": "2", "order": "2"}},
+            "org-root/ls-sp2": {"eth0": None},
+        }
+        summary = sp_vcon_placement_apply(handle, placement, chunk_size=100)
+    """
+
+    from ucsmsdk.mometa.ls.LsVConAssign import LsVConAssign
+    from ucsmsdk_samples.bulk import mo_diff, commit_in_chunks
+
+    current = {}
+    for mo in handle.query_classid(class_id="LsVConAssign"):
+        current[mo.dn] = mo
+
+    summary = {"changed": {}, "unchanged": 0, "commits": 0}
+    changes = []
+    for sp_dn, vnics in sorted(placement.items()):
+        for vnic_name, vnic_placement in sorted(vnics.items()):
+            deassign = vnic_placement is None
+            if deassign:
+                vnic_placement = {"admin_vcon": "any",
+                                  "order": "unspecified"}
+            transport = vnic_placement.get("transport", "ethernet")
+            desired = {"admin_vcon": vnic_placement.get("admin_vcon"),
+                       "order": vnic_placement.get("order")}
+
+            dn = "%s/assign-%s-vnic-%s" % (sp_dn, transport, vnic_name)
+            mo = current.get(dn)
+            diff = mo_diff(mo, desired)
+            if not diff or (deassign and mo is None):
+                summary["unchanged"] += 1
+                continue
+
+            mo = LsVConAssign(parent_mo_or_dn=sp_dn,
+                              transport=transport,
+                              vnic_name=vnic_name)
+            for prop, (current_value, value) in diff.items():
+                setattr(mo, prop, value)
+            changes.append(("add", mo))
+            summary["changed"].setdefault(sp_dn, {})[vnic_name] = diff
+
+    if not dry_run:
+        summary["commits"] = commit_in_chunks(handle, changes, chunk_size)
+    return summary
@@ -11,6 +11,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from ucsmsdk_samples.server.org_resolver import org_policy_invalidate
+
 
 def sol_policy_create(handle, name, admin_state, speed="9600", descr="",
                       parent_dn="org-root"):
@@ -47,6 +49,7 @@ def sol_policy_create(handle, name, admin_state, speed="9600", descr="",
                    admin_state=admin_state, speed=speed, descr=descr)
     handle.add_mo(mo, modify_present=True)
     handle.commit()
+    org_policy_invalidate(handle)
     return mo
 
 
@@ -119,6 +122,7 @@ def sol_policy_remove(handle, name, parent_dn="org-root"):
 
     handle.remove_mo(mo)
     handle.commit()
+    org_policy_invalidate(handle)
 
 
 def sol_policy_exist(handle, name, admin_state, speed="9600", descr="",
@@ -13,8 +13,19 @@
 
 import logging
 
+from ucsmsdk_samples.server.org_resolver import org_policy_invalidate
+
 log = logging.getLogger("ucs")
 
+_MOUNT_STATE = {
+    "unknown": "Mapping is not present",
+    "not-mounted": "Mapping is not present",
+    "unmounting": "Unmounting in progress",
+    "mounting": "Mounting in progress",
+    "mounted": "Mounted successfully",
+    "mount-failed": "Mounting failed",
+}
+
 
 def vmedia_policy_create(handle, org_dn, name, retry_on_mount_fail="yes",
                          descr="", policy_owner="local"):
@@ -54,6 +65,7 @@ def vmedia_policy_create(handle, org_dn, name, retry_on_mount_fail="yes",
                                      descr=descr)
     handle.add_mo(mo, modify_present=True)
     handle.commit()
+    org_policy_invalidate(handle)
     return mo
 
 
@@ -177,6 +189,7 @@ def vmedia_policy_delete(handle, org_dn, name):
 
     handle.remove_mo(mo)
     handle.commit()
+    org_policy_invalidate(handle)
 
 
 def vmedia_sp_attach(handle, sp_dn, vmedia_policy_name):
@@ -295,19 +308,216 @@ def vmedia_mount_state(handle, sp_dn):
     if not mount_entries:
         raise ValueError("Vmedia Mount Entries do not exist.")
 
-    mnt_state = {
-        "unknown": "Mapping is not present",
-        "not-mounted": "Mapping is not present",
-        "unmounting": "Unmounting in progress",
-        "mounting": "Mounting in progress",
-        "mounted": "Mounted successfully",
-        "mount-failed": "Mounting failed",
-    }
     for mount_entry in mount_entries:
         log.debug("name:%s, type:%s, status:%s, description:%s" % (
             mount_entry.mapping_name,
             mount_entry.device_type,
             mount_entry.oper_mount_status,
-            mnt_state[mount_entry.oper_mount_status],
+            _MOUNT_STATE[mount_entry.oper_mount_status],
         ))
     return mount_entries
+
+
+def vmedia_mount_state_all(handle, sink=None):
+    """
+    Queries the state of the mount entries of every service profile, using
+    one class query for LsServer and CimcvmediaActualMountEntry
+
+    Args:
+        handle (UcsHandle)
+        sink (callable): optional, called with the list of rows of each
+                         service profile as soon as it is built
+
+    Returns:
+        dict: {sp_dn: [row]}, row is a dict
+              {"sp_dn", "server_dn", "mapping_name", "device_type",
+               "oper_mount_status", "description"}
+              only associated service profiles with mount entries are
+              reported
+
+    Example:
+        table = vmedia_mount_state_all(handle)
+
+        from ucsmsdk_samples.reports.port_stats import jsonl_sink
+        with open("mounts.jsonl", "w") as f:
+            vmedia_mount_state_all(handle, sink=jsonl_sink(f))
+    """
+
+    query_data = handle.query_classids("LsServer",
+                                       "CimcvmediaActualMountEntry")
+
+    # the server of a service profile is its pn_dn
+    server_to_sp = {}
+    for sp in query_data["LsServer"]:
+        if sp.pn_dn:
+            server_to_sp[sp.pn_dn] = sp.dn
+
+    rows_by_server = {}
+    for mount_entry in query_data["CimcvmediaActualMountEntry"]:
+        # sys/chassis-1/blade-1/mgmt/actual-mount-list/actual-mount-entry-1
+        server_dn = mount_entry.dn.split("/mgmt/")[0]
+        sp_dn = server_to_sp.get(server_dn)
+        if sp_dn is None:
+            continue
+        rows_by_server.setdefault(server_dn, []).append({
+            "sp_dn": sp_dn,
+            "server_dn": server_dn,
+            "mapping_name": mount_entry.mapping_name,
+            "device_type": mount_entry.device_type,
+            "oper_mount_status": mount_entry.oper_mount_status,
+            "description": _MOUNT_STATE.get(mount_entry.oper_mount_status,
+                                            mount_entry.oper_mount_status),
+        })
+
+    table = {}
+    for server_dn, rows in sorted(rows_by_server.items()):
+        table[server_to_sp[server_dn]] = rows
+        if sink is not None:
+            sink(rows)
+    return table
+
+
+def vmedia_sp_attach_bulk(handle, sp_dns, vmedia_policy_name, chunk_size=50,
+                          timeout=900, poll_interval=10):
+    """
+    Attaches a vMedia policy to many service profiles in chunked commits and
+    waits for the mounts to complete. The mount state of all the service
+    profiles is tracked with one shared poll, refer vmedia_mount_state_all.
+    A service profile is mounted once every mapping of the policy is
+    mounted, entries of other mappings are ignored.
+
+    Args:
+        handle (UcsHandle)
+        sp_dns (list of string): dns of the service profiles to attach to
+        vmedia_policy_name (string): name of the vmedia policy
+        chunk_size (int): service profiles per commit
+        timeout (int): seconds to wait for the mounts, 0 to not wait
+        poll_interval (int): seconds between two polls
+
+    Returns:
+        dict: {"commits": int,
+               "mounted": {sp_dn: seconds to mount},
+               "failed": {sp_dn: [mapping names which failed]},
+               "pending": [sp_dn still mounting after timeout],
+               "unassociated": [sp_dn without a server, not tracked]}
+
+    Raises:
+        ValueError: If CimcvmediaMountConfigPolicy or LsServer does not exist
+
+    Example:
+        report = vmedia_sp_attach_bulk(
+            handle, ["org-root/ls-sp%d" % i for i in range(100)],
+            "rhel-install", chunk_size=25)
+    """
+
+    import os
+    import time
+
+    from ucsmsdk_samples.bulk import chunks, commit_in_chunks
+    from ucsmsdk_samples.server.org_resolver import org_policy_resolver
+
+    sps = handle.query_dns(*sp_dns)
+    resolver = org_policy_resolver(handle)
+    reloaded = False
+    policy_dns = {}
+    changes = []
+    for sp_dn in sp_dns:
+        sp = sps.get(sp_dn)
+        if sp is None:
+            raise ValueError("sp '%s' does not exist." % sp_dn)
+        org_dn = os.path.dirname(sp_dn)
+        policy_dn = resolver.resolve("CimcvmediaMountConfigPolicy",
+                                     vmedia_policy_name, org_dn)
+        if policy_dn is None and not reloaded:
+            # the policy may have been created outside of this session
+            resolver.invalidate()
+            reloaded = True
+            policy_dn = resolver.resolve("CimcvmediaMountConfigPolicy",
+                                         vmedia_policy_name, org_dn)
+        if policy_dn is None:
+            raise ValueError("vmedia_policy does not exist.")
+        policy_dns[sp_dn] = policy_dn
+        if sp.vmedia_policy_name != vmedia_policy_name:
+            sp.vmedia_policy_name = vmedia_policy_name
+            changes.append(("set", sp))
+
+    report = {"commits": 0, "mounted": {}, "failed": {}, "pending": [],
+              "unassociated": [sp_dn for sp_dn in sp_dns
+                               if not sps[sp_dn].pn_dn]}
+
+    # mapping names of the policies, an org may resolve to its own policy
+    mappings = {}
+    for mo in handle.query_classid("CimcvmediaConfigMountEntry"):
+        mappings.setdefault(os.path.dirname(mo.dn), set()).add(
+            mo.mapping_name)
+
+    committed_at = dict((sp_dn, time.time()) for sp_dn in sp_dns)
+    for chunk in chunks(changes, chunk_size):
+        report["commits"] += commit_in_chunks(handle, chunk, chunk_size)
+        now = time.time()
+        for action, sp in chunk:
+            committed_at[sp.dn] = now
+
+    pending = set(sp_dn for sp_dn in sp_dns if sps[sp_dn].pn_dn)
+    start = time.time()
+    while pending:
+        table = vmedia_mount_state_all(handle)
+        now = time.time()
+        for sp_dn in list(pending):
+            wanted = mappings.get(policy_dns[sp_dn], set())
+            status = dict((row["mapping_name"], row["oper_mount_status"])
+                          for row in table.get(sp_dn, [])
+                          if row["mapping_name"] in wanted)
+            failed = sorted(name for name, oper_mount_status
+                            in status.items()
+                            if oper_mount_status == "mount-failed")
+            if failed:
+                report["failed"][sp_dn] = failed
+                pending.discard(sp_dn)
+            elif all(status.get(name) == "mounted" for name in wanted):
+                report["mounted"][sp_dn] = now - committed_at[sp_dn]
+                pending.discard(sp_dn)
+
+        if not pending or now - start >= timeout:
+            break
+        time.sleep(poll_interval)
+
+    report["pending"] = sorted(pending)
+    log.debug("vMedia attach: %d mounted, %d failed, %d pending",
+              len(report["mounted"]), len(report["failed"]),
+              len(report["pending"]))
+    return report
+
+
+def vmedia_sp_detach_bulk(handle, sp_dns, chunk_size=50):
+    """
+    Detaches the vMedia policy from many service profiles in chunked commits
+
+    Args:
+        handle (UcsHandle)
+        sp_dns (list of string): dns of the service profiles to detach from
+        chunk_size (int): service profiles per commit
+
+    Returns:
+        int: number of commits
+
+    Raises:
+        ValueError: if LsServer does not exist
+
+    Example:
+        vmedia_sp_detach_bulk(handle, ["org-root/ls-sp1", "org-root/ls-sp2"])
+    """
+
+    from ucsmsdk_samples.bulk import commit_in_chunks
+
+    sps = handle.query_dns(*sp_dns)
+    changes = []
+    for sp_dn in sp_dns:
+        sp = sps.get(sp_dn)
+        if sp is None:
+            raise ValueError("sp '%s' does not exist." % sp_dn)
+        if sp.vmedia_policy_name:
+            sp.vmedia_policy_name = ""
+            changes.append(("set", sp))
+
+    return commit_in_chunks(handle, changes, chunk_size)